@@ -1,25 +1,42 @@
+import base64
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
 
-from app.core.config import DATA_DIR
-from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.admission import (
+    AdmissionLease,
+    AdmittedStreamingResponse,
+    admission_controller,
+    drain_admission,
+    require_admission,
+)
+from app.core.config import AUDIT_RETENTION_DAYS
+from app.core.database import get_read_db
+from app.core.security import Principal, get_current_user, principal_cache, require_admin
 from app.models.audit_log import AuditLog
 from app.models.document import Document
 from app.models.user import User
-from app.services.maintenance import create_backup, restore_backup, system_stats
+from app.services.analysis import llm_metrics
+from app.services.audit import audit_sink
+from app.services.audit_archive import archive_audit_logs, archived_logs_page, count_archived_logs
+from app.services.background import background_writers
+from app.services.ingestion import backfill_summaries, refresh_extracted_text
+from app.services.maintenance import restore_backup, stream_backup, system_stats
+from app.services.storage import stream_to_temp
+from app.services.watcher import watcher_metrics
 
 router = APIRouter()
 
 
 class AuditLogItem(BaseModel):
+    id: int
     timestamp: datetime
     user: str
     action: str
@@ -27,9 +44,9 @@ class AuditLogItem(BaseModel):
 
 
 class AuditLogResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int] = None
     page_size: int
+    next_cursor: Optional[str] = None
     items: List[AuditLogItem]
 
 
@@ -39,47 +56,155 @@ class SystemStatsResponse(BaseModel):
     last_backup: Optional[str]
 
 
+def encode_audit_cursor(timestamp: datetime, log_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{log_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_audit_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, log_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except (ValueError, UnicodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def audit_log_filters(
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> list:
+    filters = []
+    if user_id is not None:
+        filters.append(AuditLog.user_id == user_id)
+    if action:
+        filters.append(AuditLog.action == action)
+    if start:
+        filters.append(AuditLog.timestamp >= start)
+    if end:
+        filters.append(AuditLog.timestamp <= end)
+    return filters
+
+
+def audit_log_query(db: Session, filters: list, cursor: Optional[Tuple[datetime, int]] = None):
+    query = (
+        db.query(
+            AuditLog.id,
+            AuditLog.timestamp,
+            AuditLog.action,
+            User.username,
+            Document.filename,
+        )
+        .outerjoin(User, User.id == AuditLog.user_id)
+        .outerjoin(Document, Document.id == AuditLog.target_id)
+        .filter(*filters)
+    )
+    if cursor is not None:
+        query = query.filter(tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(*cursor))
+    return query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+
+
+def _archived_audit_page(
+    user: Optional[str],
+    action: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    position: Optional[Tuple[datetime, int]],
+    page_size: int,
+    include_total: bool,
+) -> AuditLogResponse:
+    page = archived_logs_page(user=user, action=action, start=start, end=end, cursor=position, limit=page_size + 1)
+    items = [
+        AuditLogItem(
+            id=record["id"],
+            timestamp=record["timestamp"],
+            user=record.get("user") or "Unknown",
+            action=record["action"],
+            target_file=record.get("target_file"),
+        )
+        for record in page[:page_size]
+    ]
+    next_cursor = None
+    if len(page) > page_size:
+        last = page[page_size - 1]
+        next_cursor = encode_audit_cursor(last["timestamp"], last["id"])
+
+    total = None
+    if include_total:
+        total = count_archived_logs(user=user, action=action, start=start, end=end)
+    return AuditLogResponse(total=total, page_size=page_size, next_cursor=next_cursor, items=items)
+
+
 @router.get("/audit-logs", response_model=AuditLogResponse)
 def list_audit_logs(
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None),
     page_size: int = Query(25, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    include_total: bool = Query(False),
+    user: Optional[str] = Query(None),
+    action: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    source: str = Query("live", pattern="^(live|archive)$"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> AuditLogResponse:
     if current_user.role != "Admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
 
-    base_query = db.query(AuditLog)
-    total = base_query.count()
-    logs = (
-        base_query.order_by(AuditLog.timestamp.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+    position = decode_audit_cursor(cursor) if cursor else None
+    if source == "archive":
+        return _archived_audit_page(user, action, start, end, position, page_size, include_total)
 
-    items: List[AuditLogItem] = []
-    for log in logs:
-        user = db.query(User).filter(User.id == log.user_id).first()
-        document = None
-        if log.target_id is not None:
-            document = db.query(Document).filter(Document.id == log.target_id).first()
-        items.append(
-            AuditLogItem(
-                timestamp=log.timestamp,
-                user=user.username if user else "Unknown",
-                action=log.action,
-                target_file=document.filename if document else None,
-            )
+    user_id = None
+    if user:
+        match = db.query(User.id).filter(User.username == user).first()
+        if not match:
+            return AuditLogResponse(total=0 if include_total else None, page_size=page_size, items=[])
+        user_id = match.id
+
+    filters = audit_log_filters(user_id=user_id, action=action, start=start, end=end)
+    rows = audit_log_query(db, filters, position).limit(page_size + 1).all()
+
+    items = [
+        AuditLogItem(
+            id=row.id,
+            timestamp=row.timestamp,
+            user=row.username or "Unknown",
+            action=row.action,
+            target_file=row.filename,
         )
+        for row in rows[:page_size]
+    ]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = encode_audit_cursor(last.timestamp, last.id)
+
+    total = None
+    if include_total:
+        total = db.query(func.count(AuditLog.id)).filter(*filters).scalar()
+
+    return AuditLogResponse(total=total, page_size=page_size, next_cursor=next_cursor, items=items)
+
 
-    return AuditLogResponse(total=total, page=page, page_size=page_size, items=items)
+@router.post("/audit-logs/archive")
+def schedule_audit_archive(
+    background_tasks: BackgroundTasks,
+    retention_days: int = Query(AUDIT_RETENTION_DAYS, ge=0),
+    current_user: Principal = Depends(get_current_user),
+) -> dict:
+    if current_user.role != "Admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    background_tasks.add_task(background_writers.run, archive_audit_logs, retention_days)
+    return {"status": "scheduled", "retention_days": retention_days}
 
 
 @router.get("/stats", response_model=SystemStatsResponse)
 def get_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ) -> SystemStatsResponse:
     if current_user.role != "Admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
@@ -88,35 +213,78 @@ def get_stats(
     return SystemStatsResponse(**stats.__dict__)
 
 
-@router.post("/backup")
-def download_backup(
-    current_user: User = Depends(get_current_user),
-) -> FileResponse:
+@router.get("/metrics")
+def get_metrics(
+    current_user: Principal = Depends(get_current_user),
+) -> dict:
     if current_user.role != "Admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
-    backup_path = create_backup()
-    return FileResponse(path=backup_path, filename=backup_path.name, media_type="application/zip")
+    return {
+        "llm": llm_metrics(),
+        "watcher": watcher_metrics(),
+        "audit": {"strict": audit_sink.strict, "running": audit_sink.running, "pending": audit_sink.pending()},
+        "principals": principal_cache.metrics(),
+        "admission": admission_controller.metrics(),
+    }
 
 
-@router.post("/restore")
-def restore_from_backup(
-    backup_file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+@router.post("/summaries/backfill")
+def schedule_summary_backfill(
+    background_tasks: BackgroundTasks,
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: Principal = Depends(get_current_user),
+) -> dict:
+    if current_user.role != "Admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    background_tasks.add_task(background_writers.run, backfill_summaries, limit)
+    return {"status": "scheduled"}
+
+
+@router.post("/text/refresh")
+def schedule_text_refresh(
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_user),
 ) -> dict:
     if current_user.role != "Admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    background_tasks.add_task(background_writers.run, refresh_extracted_text)
+    return {"status": "scheduled"}
 
-    temp_path = DATA_DIR / "restore_upload.zip"
-    temp_path.parent.mkdir(parents=True, exist_ok=True)
-    with temp_path.open("wb") as out_file:
-        out_file.write(backup_file.file.read())
 
+@router.post("/backup")
+def download_backup(
+    since: Optional[str] = Query(None),
+    current_user: Principal = Depends(require_admin),
+    lease: AdmissionLease = Depends(require_admission("backup")),
+) -> StreamingResponse:
+    try:
+        filename, chunks = stream_backup(since=since)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    response = AdmittedStreamingResponse(chunks, lease, media_type="application/zip")
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
+@router.post(
+    "/restore",
+    dependencies=[Depends(require_admin), Depends(require_admission("backup")), Depends(drain_admission("ingest"))],
+)
+def restore_from_backup(
+    backup_file: UploadFile = File(...),
+    parent_files: List[UploadFile] = File(default=[]),
+) -> dict:
+    temp_paths: List[Path] = []
     try:
-        restore_backup(temp_path)
+        for upload in [backup_file, *parent_files]:
+            temp_paths.append(stream_to_temp(upload.file, suffix=".zip").path)
+        restore_backup(temp_paths[0], temp_paths[1:])
     except (FileNotFoundError, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except TimeoutError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
     finally:
-        if temp_path.exists():
-            temp_path.unlink()
+        for temp_path in temp_paths:
+            temp_path.unlink(missing_ok=True)
 
     return {"status": "restored"}
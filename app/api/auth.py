@@ -2,8 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import create_access_token, verify_password
+from app.core.database import get_read_db
+from app.core.security import create_access_token, principal_cache, principal_from_user, verify_password
 from app.models.user import User
 
 router = APIRouter()
@@ -21,10 +21,11 @@ class TokenResponse(BaseModel):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
+def login(payload: LoginRequest, db: Session = Depends(get_read_db)) -> TokenResponse:
     user = db.query(User).filter(User.username == payload.username).first()
     if not user or not verify_password(payload.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    principal_cache.put(principal_from_user(user))
     token = create_access_token(user.username)
     return TokenResponse(access_token=token, role=user.role)
@@ -1,23 +1,48 @@
 from datetime import date
 import csv
 import io
+import json
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.search import search_documents
-from app.core.security import get_current_user
-from app.models.audit_log import AuditLog
+from app.core.admission import AdmissionLease, AdmittedStreamingResponse, require_admission
+from app.core.config import (
+    EXPORT_BATCH_SIZE,
+    RENDER_DEFAULT_WIDTH,
+    RENDER_MAX_WIDTH,
+    RENDER_MIN_WIDTH,
+)
+from app.core.database import ReadSessionLocal, get_db, get_read_db
+from app.core.facets import FACET_FIELDS, facet_index
+from app.core.search import match_document_ids, rank_document_ids, search_documents
+from app.core.security import Principal, get_current_user
 from app.models.document import Document
-from app.models.user import User
-from app.services.ingestion import ingest_file, parse_date
-from app.services.sync import dry_run_summary, sync_directory
-from app.services.storage import ensure_temp_dir
+from app.services.audit import record_audit
+from app.services.bulk import bulk_job_report, create_bulk_job, get_bulk_job, stage_uploads, submit_bulk_job
+from app.services.ingest_jobs import (
+    create_ingest_job,
+    get_ingest_job,
+    ingest_job_report,
+    is_ingest_pending,
+    submit_ingest_job,
+)
+from app.services.ingestion import is_duplicate, parse_date
+from app.services.sync import (
+    create_sync_job,
+    dry_run_summary,
+    get_sync_job,
+    job_report,
+    prepare_resume,
+    request_cancel,
+    run_sync_job,
+)
+from app.services.renders import render_page
+from app.services.storage import iter_file_range, stream_to_temp
 
 router = APIRouter()
 
@@ -32,6 +57,18 @@ class SearchResponse(BaseModel):
     ai_summary: Optional[List[str]] = None
 
 
+class FacetBucket(BaseModel):
+    value: Optional[str]
+    count: int
+
+
+class FacetResponse(BaseModel):
+    total: int
+    doc_type: List[FacetBucket]
+    department: List[FacetBucket]
+    year: List[FacetBucket]
+
+
 class BulkSyncRequest(BaseModel):
     root_dir: str
     doc_type: str = "Unknown"
@@ -42,7 +79,35 @@ class BulkSyncRequest(BaseModel):
     dry_run: bool = False
 
 
-@router.post("/upload")
+def document_id_query(
+    db: Session,
+    doc_type: Optional[str] = None,
+    department: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    include_sensitive: bool = False,
+):
+    query = db.query(Document.id)
+    if doc_type:
+        query = query.filter(Document.doc_type == doc_type)
+    if department:
+        query = query.filter(Document.department == department)
+    if start_date:
+        query = query.filter(Document.date_published >= start_date)
+    if end_date:
+        query = query.filter(Document.date_published <= end_date)
+    if not include_sensitive:
+        query = query.filter(Document.is_sensitive.is_(False))
+    return query
+
+
+def _load_documents(db: Session, doc_ids: List[int]) -> dict:
+    if not doc_ids:
+        return {}
+    return {doc.id: doc for doc in db.query(Document).filter(Document.id.in_(doc_ids))}
+
+
+@router.post("/upload", status_code=202, dependencies=[Depends(require_admission("ingest"))])
 def upload_document(
     doc_type: str = Query(...),
     department: Optional[str] = Query(None),
@@ -51,14 +116,14 @@ def upload_document(
     is_sensitive: bool = Query(False),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if is_sensitive and current_user.role != "Admin":
         raise HTTPException(status_code=403, detail="Admin access required for sensitive uploads")
-    temp_dir = ensure_temp_dir()
-    temp_path = temp_dir / file.filename
-    with temp_path.open("wb") as out_file:
-        out_file.write(file.file.read())
+    staged = stream_to_temp(file.file)
+    if is_duplicate(db, staged.file_hash) or is_ingest_pending(db, staged.file_hash):
+        staged.path.unlink(missing_ok=True)
+        raise HTTPException(status_code=409, detail="Duplicate document detected")
 
     metadata = {
         "doc_type": doc_type,
@@ -69,50 +134,102 @@ def upload_document(
     }
 
     try:
-        document = ingest_file(
-            db=db,
-            file_path=temp_path.as_posix(),
-            filename=file.filename,
-            metadata=metadata,
-            user_id=current_user.id,
-        )
+        job = create_ingest_job(db, staged, file.filename, metadata, user_id=current_user.id)
+    except Exception:
+        staged.path.unlink(missing_ok=True)
+        raise
+    submit_ingest_job(job.id)
+    return {"job_id": job.id, "status": job.status, "file_hash": job.file_hash}
+
+
+@router.post("/upload/bulk", status_code=202, dependencies=[Depends(require_admission("ingest"))])
+def bulk_upload_documents(
+    doc_type: str = Query(...),
+    department: Optional[str] = Query(None),
+    date_published: Optional[str] = Query(None),
+    tags: Optional[str] = Query(None),
+    is_sensitive: bool = Query(False),
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if is_sensitive and current_user.role != "Admin":
+        raise HTTPException(status_code=403, detail="Admin access required for sensitive uploads")
+    try:
+        items = stage_uploads((upload.filename or "upload", upload.file) for upload in files)
     except ValueError as exc:
-        temp_path.unlink(missing_ok=True)
-        raise HTTPException(status_code=409, detail=str(exc)) from exc
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    metadata = {
+        "doc_type": doc_type,
+        "department": department,
+        "date_published": parse_date(date_published),
+        "tags": tags.split(",") if tags else None,
+        "is_sensitive": is_sensitive,
+    }
+    try:
+        job = create_bulk_job(db, items, metadata, user_id=current_user.id)
+    except Exception:
+        for item in items:
+            if item.staged is not None:
+                item.staged.path.unlink(missing_ok=True)
+        raise
+    submit_bulk_job(job.id)
+    return {"job_id": job.id, "status": job.status, "total": job.total_files}
+
+
+@router.get("/upload/bulk/{job_id}")
+def get_bulk_upload_status(
+    job_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    job = get_bulk_job(db, job_id)
+    if not job or (job.user_id != current_user.id and current_user.role != "Admin"):
+        raise HTTPException(status_code=404, detail="Bulk upload job not found")
+    return bulk_job_report(db, job)
 
-    return {"id": document.id, "file_hash": document.file_hash}
+
+@router.get("/upload/{job_id}")
+def get_upload_status(
+    job_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    job = get_ingest_job(db, job_id)
+    if not job or (job.user_id != current_user.id and current_user.role != "Admin"):
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return ingest_job_report(job)
 
 
-@router.get("/search", response_model=List[SearchResponse])
+@router.get("/search", response_model=List[SearchResponse], dependencies=[Depends(require_admission("search"))])
 def search_documents_endpoint(
     q: str = Query(..., min_length=1),
     doc_type: Optional[str] = Query(None),
     department: Optional[str] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    query = db.query(Document)
-    if doc_type:
-        query = query.filter(Document.doc_type == doc_type)
-    if department:
-        query = query.filter(Document.department == department)
-    if start_date:
-        query = query.filter(Document.date_published >= parse_date(start_date))
-    if end_date:
-        query = query.filter(Document.date_published <= parse_date(end_date))
-    if current_user.role != "Admin":
-        query = query.filter(Document.is_sensitive.is_(False))
-
-    documents = {doc.id: doc for doc in query.all()}
-    allowed_ids = list(documents.keys())
+    allowed_ids = [
+        row.id
+        for row in document_id_query(
+            db,
+            doc_type=doc_type,
+            department=department,
+            start_date=parse_date(start_date),
+            end_date=parse_date(end_date),
+            include_sensitive=current_user.role == "Admin",
+        )
+    ]
     if not allowed_ids:
         return []
 
     results = search_documents(q, allowed_ids=allowed_ids)
     if not results:
         return []
+    documents = _load_documents(db, [int(item["doc_id"]) for item in results])
     payload = []
     for item in results:
         doc_id = int(item["doc_id"])
@@ -128,16 +245,79 @@ def search_documents_endpoint(
             }
         )
 
-    db.add(AuditLog(user_id=current_user.id, action="search", target_id=None))
-    db.commit()
+    record_audit(current_user.id, "search")
     return payload
 
 
+@router.get("/facets", response_model=FacetResponse, dependencies=[Depends(require_admission("search"))])
+def document_facets(
+    q: Optional[str] = Query(None),
+    doc_type: Optional[str] = Query(None),
+    department: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    current_user: Principal = Depends(get_current_user),
+):
+    hit_ids = None
+    if q and q.strip():
+        hit_ids = [int(doc_id) for doc_id in match_document_ids(q)]
+    counts = facet_index.counts(
+        include_sensitive=current_user.role == "Admin",
+        hit_ids=hit_ids,
+        doc_type=doc_type,
+        department=department,
+        start_date=parse_date(start_date),
+        end_date=parse_date(end_date),
+    )
+    return {
+        "total": counts["total"],
+        **{
+            name: [
+                {"value": value, "count": count}
+                for value, count in sorted(
+                    counts[name].items(), key=lambda pair: (-pair[1], pair[0] is None, pair[0] or "")
+                )
+            ]
+            for name in FACET_FIELDS
+        },
+    }
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if end < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
 @router.get("/{document_id}/preview")
 def preview_document(
     document_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     document = db.query(Document).filter(Document.id == document_id).first()
     if not document:
@@ -149,9 +329,105 @@ def preview_document(
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File missing from storage")
 
-    db.add(AuditLog(user_id=current_user.id, action="view", target_id=document.id))
-    db.commit()
-    return FileResponse(path=file_path, media_type="application/pdf", filename=document.filename)
+    etag = f'"{document.file_hash}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Accept-Ranges": "bytes"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        record_audit(current_user.id, "view", document.id)
+        return Response(status_code=304, headers=headers)
+
+    size = file_path.stat().st_size
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None or (byte_range[0] == 0 and not if_range):
+        record_audit(current_user.id, "view", document.id)
+    if byte_range is None:
+        return FileResponse(path=file_path, media_type="application/pdf", filename=document.filename, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file_range(file_path, start, end),
+        status_code=206,
+        media_type="application/pdf",
+        headers=headers,
+    )
+
+
+@router.get("/{document_id}/pages/{page}.png")
+def render_document_page(
+    document_id: int,
+    page: int,
+    request: Request,
+    width: int = Query(RENDER_DEFAULT_WIDTH, ge=RENDER_MIN_WIDTH, le=RENDER_MAX_WIDTH),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if document.is_sensitive and current_user.role != "Admin":
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    if not Path(document.file_path).exists():
+        raise HTTPException(status_code=404, detail="File missing from storage")
+
+    etag = f'"{document.file_hash}-{page}-{width}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        record_audit(current_user.id, "view", document.id)
+        return Response(status_code=304, headers=headers)
+
+    try:
+        image_path = render_page(document.file_hash, document.file_path, page, width)
+    except IndexError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    record_audit(current_user.id, "view", document.id)
+    return FileResponse(path=image_path, media_type="image/png", headers=headers)
+
+
+def _export_row(document: Document) -> dict:
+    return {
+        "id": document.id,
+        "filename": document.filename,
+        "doc_type": document.doc_type,
+        "date_published": document.date_published.isoformat() if document.date_published else None,
+        "department": document.department,
+        "tags": document.tags if isinstance(document.tags, list) else ([document.tags] if document.tags else []),
+    }
+
+
+def _iter_export(doc_ids: List[int], export_format: str) -> Iterator[str]:
+    if export_format == "csv":
+        yield "Filename,Date,Department,Tags\r\n"
+    db = ReadSessionLocal()
+    try:
+        for offset in range(0, len(doc_ids), EXPORT_BATCH_SIZE):
+            batch = doc_ids[offset : offset + EXPORT_BATCH_SIZE]
+            documents = _load_documents(db, batch)
+            output = io.StringIO()
+            writer = csv.writer(output)
+            for doc_id in batch:
+                document = documents.get(doc_id)
+                if not document:
+                    continue
+                row = _export_row(document)
+                if export_format == "ndjson":
+                    output.write(json.dumps(row) + "\n")
+                else:
+                    writer.writerow(
+                        [row["filename"], row["date_published"] or "", row["department"] or "", ",".join(row["tags"])]
+                    )
+            db.expunge_all()
+            yield output.getvalue()
+    finally:
+        db.close()
 
 
 @router.get("/export")
@@ -161,50 +437,29 @@ def export_search_results(
     department: Optional[str] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    lease: AdmissionLease = Depends(require_admission("export")),
 ):
-    query = db.query(Document)
-    if doc_type:
-        query = query.filter(Document.doc_type == doc_type)
-    if department:
-        query = query.filter(Document.department == department)
-    if start_date:
-        query = query.filter(Document.date_published >= parse_date(start_date))
-    if end_date:
-        query = query.filter(Document.date_published <= parse_date(end_date))
-    if current_user.role != "Admin":
-        query = query.filter(Document.is_sensitive.is_(False))
-
-    documents = {doc.id: doc for doc in query.all()}
-    allowed_ids = list(documents.keys())
-    if not allowed_ids:
-        return StreamingResponse(iter(()), media_type="text/csv")
-
-    results = search_documents(q, allowed_ids=allowed_ids, limit=1000)
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Filename", "Date", "Department", "Tags"])
-    for item in results:
-        doc_id = int(item["doc_id"])
-        document = documents.get(doc_id)
-        if not document:
-            continue
-        tags = ",".join(document.tags) if isinstance(document.tags, list) else (document.tags or "")
-        writer.writerow(
-            [
-                document.filename,
-                document.date_published.isoformat() if document.date_published else "",
-                document.department or "",
-                tags,
-            ]
+    allowed_ids = [
+        row.id
+        for row in document_id_query(
+            db,
+            doc_type=doc_type,
+            department=department,
+            start_date=parse_date(start_date),
+            end_date=parse_date(end_date),
+            include_sensitive=current_user.role == "Admin",
         )
+    ]
+    ranked_ids = [int(doc_id) for doc_id in rank_document_ids(q, allowed_ids=allowed_ids)] if allowed_ids else []
 
-    db.add(AuditLog(user_id=current_user.id, action="export", target_id=None))
-    db.commit()
+    record_audit(current_user.id, "export")
 
-    response = StreamingResponse(iter([output.getvalue()]), media_type="text/csv")
-    response.headers["Content-Disposition"] = "attachment; filename=ukb_search_export.csv"
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "text/csv"
+    response = AdmittedStreamingResponse(_iter_export(ranked_ids, export_format), lease, media_type=media_type)
+    response.headers["Content-Disposition"] = f"attachment; filename=ukb_search_export.{export_format}"
     return response
 
 
@@ -213,7 +468,7 @@ def sync_documents(
     payload: BulkSyncRequest,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "Admin":
         raise HTTPException(status_code=403, detail="Admin access required")
@@ -235,5 +490,61 @@ def sync_documents(
             "duplicate_documents": summary.duplicate_documents,
         }
 
-    background_tasks.add_task(sync_directory, payload.root_dir, metadata, current_user.id)
-    return {"status": "scheduled"}
+    try:
+        job = create_sync_job(db, payload.root_dir, metadata, current_user.id)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    background_tasks.add_task(run_sync_job, job.id)
+    return {"status": "scheduled", "job_id": job.id}
+
+
+def _get_sync_job_or_404(db: Session, job_id: str):
+    job = get_sync_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
+
+
+@router.get("/sync/{job_id}")
+def get_sync_status(
+    job_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if current_user.role != "Admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return job_report(db, _get_sync_job_or_404(db, job_id))
+
+
+@router.post("/sync/{job_id}/cancel")
+def cancel_sync_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if current_user.role != "Admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    job = _get_sync_job_or_404(db, job_id)
+    try:
+        request_cancel(db, job)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return {"status": job.status, "job_id": job.id}
+
+
+@router.post("/sync/{job_id}/resume")
+def resume_sync_job(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if current_user.role != "Admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    job = _get_sync_job_or_404(db, job_id)
+    try:
+        prepare_resume(db, job)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    background_tasks.add_task(run_sync_job, job.id)
+    return {"status": "scheduled", "job_id": job.id}
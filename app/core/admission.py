@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Optional
+
+import anyio
+from fastapi import Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import ADMISSION_CLASSES, RESTORE_DRAIN_TIMEOUT_SECONDS
+from app.core.security import Principal, get_current_user
+
+
+class AdmissionRejected(RuntimeError):
+    def __init__(self, name: str, retry_after: int) -> None:
+        super().__init__(f"Too many concurrent {name} requests")
+        self.name = name
+        self.retry_after = retry_after
+
+
+@dataclass
+class AdmissionMetrics:
+    admitted: int = 0
+    rejected: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+class AdmissionClass:
+    def __init__(self, name: str, concurrency: int, queue: int, timeout: float, retry_after: int) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.paused = False
+        self._waiters: deque[anyio.Event] = deque()
+        self._drained: Optional[anyio.Event] = None
+        self._metrics = AdmissionMetrics()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _reject(self) -> AdmissionRejected:
+        self._metrics.rejected += 1
+        return AdmissionRejected(self.name, self.retry_after)
+
+    async def acquire(self) -> None:
+        start = time.monotonic()
+        if self.paused:
+            raise self._reject()
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+        else:
+            if len(self._waiters) >= self.queue_limit:
+                raise self._reject()
+            waiter = anyio.Event()
+            self._waiters.append(waiter)
+            admitted = False
+            try:
+                with anyio.move_on_after(self.timeout):
+                    await waiter.wait()
+                admitted = waiter.is_set()
+            finally:
+                if not admitted:
+                    if waiter.is_set():
+                        self.release()
+                    else:
+                        self._waiters.remove(waiter)
+            if not admitted:
+                raise self._reject()
+        waited = time.monotonic() - start
+        self._metrics.admitted += 1
+        self._metrics.total_wait_seconds += waited
+        self._metrics.max_wait_seconds = max(self._metrics.max_wait_seconds, waited)
+
+    def release(self) -> None:
+        if self._waiters:
+            self._waiters.popleft().set()
+            return
+        self.in_flight -= 1
+        if self._drained is not None and self.in_flight == 0:
+            self._drained.set()
+
+    async def drain(self, timeout: float) -> None:
+        self.paused = True
+        drained = anyio.Event()
+        self._drained = drained
+        try:
+            if self.in_flight:
+                with anyio.move_on_after(timeout):
+                    await drained.wait()
+        except BaseException:
+            self.paused = False
+            raise
+        finally:
+            self._drained = None
+        if self.in_flight:
+            self.paused = False
+            raise self._reject()
+
+    def resume(self) -> None:
+        self.paused = False
+
+    def metrics(self) -> dict:
+        admitted = self._metrics.admitted
+        return {
+            "concurrency": self.concurrency,
+            "queue_limit": self.queue_limit,
+            "paused": self.paused,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": admitted,
+            "rejected": self._metrics.rejected,
+            "avg_wait_ms": round(self._metrics.total_wait_seconds / admitted * 1000, 2) if admitted else 0.0,
+            "max_wait_ms": round(self._metrics.max_wait_seconds * 1000, 2),
+        }
+
+
+class AdmissionController:
+    def __init__(self, classes: Optional[dict] = None) -> None:
+        self._classes = {
+            name: AdmissionClass(name, **settings) for name, settings in (classes or ADMISSION_CLASSES).items()
+        }
+
+    async def acquire(self, name: str) -> None:
+        await self._classes[name].acquire()
+
+    def release(self, name: str) -> None:
+        self._classes[name].release()
+
+    async def drain(self, name: str, timeout: float = RESTORE_DRAIN_TIMEOUT_SECONDS) -> None:
+        await self._classes[name].drain(timeout)
+
+    def resume(self, name: str) -> None:
+        self._classes[name].resume()
+
+    def metrics(self) -> dict:
+        return {name: admission.metrics() for name, admission in self._classes.items()}
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionLease:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.detached = False
+        self.released = False
+
+    def detach(self) -> None:
+        self.detached = True
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            admission_controller.release(self.name)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    def __init__(self, content, lease: AdmissionLease, **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        lease.detach()
+        self.lease = lease
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.lease.release()
+
+
+def _service_unavailable(exc: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(exc),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def acquire_admission(name: str) -> AdmissionLease:
+    try:
+        await admission_controller.acquire(name)
+    except AdmissionRejected as exc:
+        raise _service_unavailable(exc) from exc
+    return AdmissionLease(name)
+
+
+def require_admission(name: str) -> Callable[..., AsyncIterator[AdmissionLease]]:
+    async def dependency(current_user: Principal = Depends(get_current_user)) -> AsyncIterator[AdmissionLease]:
+        lease = await acquire_admission(name)
+        try:
+            yield lease
+        finally:
+            if not lease.detached:
+                lease.release()
+
+    return dependency
+
+
+def drain_admission(name: str) -> Callable[..., AsyncIterator[None]]:
+    async def dependency(current_user: Principal = Depends(get_current_user)) -> AsyncIterator[None]:
+        try:
+            await admission_controller.drain(name)
+        except AdmissionRejected as exc:
+            raise _service_unavailable(exc) from exc
+        try:
+            yield
+        finally:
+            admission_controller.resume(name)
+
+    return dependency
@@ -4,18 +4,86 @@ BASE_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = BASE_DIR / "data"
 DB_DIR = DATA_DIR / "db"
 INDEX_DIR = DATA_DIR / "index"
+TEXT_DIR = DATA_DIR / "text"
+AUDIT_ARCHIVE_DIR = DATA_DIR / "audit_archive"
+RENDER_DIR = DATA_DIR / "renders"
+BACKUP_DIR = DATA_DIR / "backups"
 STORAGE_DIR = BASE_DIR / "storage"
 WATCH_DIR = BASE_DIR / "watch"
 
 DB_PATH = DB_DIR / "ukb.sqlite3"
+SQLITE_JOURNAL_MODE = "WAL"
+SQLITE_SYNCHRONOUS = "NORMAL"
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_CACHE_SIZE_KB = 64 * 1024
+SQLITE_WRITE_POOL_SIZE = 5
+SQLITE_READ_POOL_SIZE = 10
 SECRET_KEY = "change-me-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
-BACKUP_SCHEMA_VERSION = 1
+PRINCIPAL_CACHE_TTL_SECONDS = 60.0
+PRINCIPAL_CACHE_SIZE = 1024
+BACKUP_SCHEMA_VERSION = 2
+BACKUP_COMPRESSION_SAMPLE_BYTES = 64 * 1024
+BACKUP_MIN_COMPRESSION_RATIO = 0.9
+BACKUP_RESTORE_WORKERS = 4
+RESTORE_DRAIN_TIMEOUT_SECONDS = 60.0
+
+LLM_HOST = "http://localhost:11434"
+LLM_MODEL = "llama3.2"
+LLM_TIMEOUT_SECONDS = 60.0
+LLM_MAX_CONCURRENCY = 2
+LLM_FAILURE_THRESHOLD = 3
+LLM_COOLDOWN_SECONDS = 30.0
+
+INGEST_BATCH_SIZE = 25
+INGEST_WORKERS = 2
+BULK_WORKERS = 4
+BULK_MAX_FILES = 500
+BULK_MAX_ZIP_ENTRIES = 2000
+BULK_MAX_EXPANDED_BYTES = 2 * 1024 * 1024 * 1024
+EXPORT_BATCH_SIZE = 500
+
+ADMISSION_CLASSES = {
+    "search": {"concurrency": 8, "queue": 64, "timeout": 2.0, "retry_after": 1},
+    "ingest": {"concurrency": 2, "queue": 16, "timeout": 10.0, "retry_after": 15},
+    "export": {"concurrency": 2, "queue": 8, "timeout": 5.0, "retry_after": 10},
+    "backup": {"concurrency": 1, "queue": 0, "timeout": 0.0, "retry_after": 60},
+}
+
+AUDIT_STRICT_SYNC = False
+AUDIT_FLUSH_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL_SECONDS = 2.0
+AUDIT_BUFFER_LIMIT = 10000
+AUDIT_RETENTION_DAYS = 90
+AUDIT_ARCHIVE_BATCH_SIZE = 5000
+AUDIT_ARCHIVE_INTERVAL_SECONDS = 24 * 60 * 60
+
+OCR_MIN_PAGE_CHARS = 50
+OCR_DPI = 300
+OCR_WORKERS = 4
+OCR_NICENESS = 10
+OCR_PAGE_TIMEOUT_SECONDS = 120.0
+RENDER_MIN_WIDTH = 64
+RENDER_MAX_WIDTH = 2000
+RENDER_DEFAULT_WIDTH = 800
+RENDER_THUMBNAIL_WIDTH = 240
+RENDER_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+WATCH_STABLE_SECONDS = 2.0
+WATCH_POLL_SECONDS = 0.5
+WATCH_WORKERS = 2
+WATCH_QUEUE_SIZE = 100
+WATCH_RECONCILE_SECONDS = 300.0
+WATCH_MANIFEST_PATH = DATA_DIR / "watch_manifest.json"
 
 
 def ensure_directories() -> None:
     DB_DIR.mkdir(parents=True, exist_ok=True)
     INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    TEXT_DIR.mkdir(parents=True, exist_ok=True)
+    RENDER_DIR.mkdir(parents=True, exist_ok=True)
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
     STORAGE_DIR.mkdir(parents=True, exist_ok=True)
     WATCH_DIR.mkdir(parents=True, exist_ok=True)
@@ -1,21 +1,75 @@
-from sqlalchemy import create_engine
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import DB_PATH, ensure_directories
+from app.core.config import (
+    DB_PATH,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_READ_POOL_SIZE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_WRITE_POOL_SIZE,
+    ensure_directories,
+)
+from app.core.migrations import run_migrations
 from app.models.base import Base
 
 
-def get_database_url() -> str:
-    return f"sqlite:///{DB_PATH.as_posix()}"
+def get_database_url(db_path: Path = DB_PATH) -> str:
+    return f"sqlite:///{db_path.as_posix()}"
+
+
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    pragmas = [
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        pragmas.insert(0, f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+
+def build_engine(db_path: Path = DB_PATH, read_only: bool = False, tuned: bool = True) -> Engine:
+    pool_size = SQLITE_READ_POOL_SIZE if read_only else SQLITE_WRITE_POOL_SIZE
+    built = create_engine(
+        get_database_url(db_path),
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=pool_size,
+    )
+    if tuned:
+        pragmas = sqlite_pragmas(read_only=read_only)
+
+        @event.listens_for(built, "connect")
+        def _apply_pragmas(dbapi_connection, _connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+
+    return built
 
 
-engine = create_engine(get_database_url(), connect_args={"check_same_thread": False})
+engine = build_engine()
+read_engine = build_engine(read_only=True)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
 
 
 def init_db() -> None:
     ensure_directories()
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 
 def get_db():
@@ -24,3 +78,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
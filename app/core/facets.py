@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.database import ReadSessionLocal
+from app.models.document import Document
+
+FACET_FIELDS = ("doc_type", "department", "year")
+
+
+@dataclass
+class FacetRecord:
+    doc_id: int
+    doc_type: str
+    department: Optional[str]
+    date_published: Optional[date]
+    is_sensitive: bool
+
+    def values(self) -> dict[str, Optional[str]]:
+        return {
+            "doc_type": self.doc_type,
+            "department": self.department,
+            "year": str(self.date_published.year) if self.date_published else None,
+        }
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def _mask_from_ordinals(ordinals: Iterable[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        bits[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _empty_counts() -> dict[str, dict[Optional[str], int]]:
+    return {name: {} for name in FACET_FIELDS}
+
+
+def facet_rows_query(db: Session):
+    return db.query(
+        Document.id,
+        Document.doc_type,
+        Document.department,
+        Document.date_published,
+        Document.is_sensitive,
+    )
+
+
+class FacetIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._clear()
+
+    def _clear(self) -> None:
+        self._ordinals: dict[int, int] = {}
+        self._records: list[Optional[FacetRecord]] = []
+        self._bitsets = _empty_counts()
+        self._live = 0
+        self._sensitive = 0
+        self._totals = {False: 0, True: 0}
+        self._global = {False: _empty_counts(), True: _empty_counts()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._loaded = False
+            self._clear()
+
+    def add(self, records: Iterable[FacetRecord]) -> None:
+        with self._lock:
+            if not self._loaded:
+                return
+            for record in records:
+                self._add_locked(record)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        db = ReadSessionLocal()
+        try:
+            rows = facet_rows_query(db).all()
+        finally:
+            db.close()
+        self._clear()
+        for row in rows:
+            self._add_locked(
+                FacetRecord(
+                    doc_id=row.id,
+                    doc_type=row.doc_type,
+                    department=row.department,
+                    date_published=row.date_published,
+                    is_sensitive=bool(row.is_sensitive),
+                )
+            )
+        self._loaded = True
+
+    def _adjust_global(self, record: FacetRecord, delta: int) -> None:
+        scopes = (True,) if record.is_sensitive else (False, True)
+        for include_sensitive in scopes:
+            self._totals[include_sensitive] += delta
+            counts = self._global[include_sensitive]
+            for name, value in record.values().items():
+                counts[name][value] = counts[name].get(value, 0) + delta
+                if not counts[name][value]:
+                    del counts[name][value]
+
+    def _remove_locked(self, doc_id: int) -> None:
+        ordinal = self._ordinals.pop(doc_id, None)
+        if ordinal is None:
+            return
+        record = self._records[ordinal]
+        self._records[ordinal] = None
+        bit = 1 << ordinal
+        self._live &= ~bit
+        self._sensitive &= ~bit
+        for name, value in record.values().items():
+            self._bitsets[name][value] &= ~bit
+        self._adjust_global(record, -1)
+
+    def _add_locked(self, record: FacetRecord) -> None:
+        self._remove_locked(record.doc_id)
+        ordinal = len(self._records)
+        self._records.append(record)
+        self._ordinals[record.doc_id] = ordinal
+        bit = 1 << ordinal
+        self._live |= bit
+        if record.is_sensitive:
+            self._sensitive |= bit
+        for name, value in record.values().items():
+            self._bitsets[name][value] = self._bitsets[name].get(value, 0) | bit
+        self._adjust_global(record, 1)
+
+    def _date_mask(self, start_date: Optional[date], end_date: Optional[date]) -> int:
+        return _mask_from_ordinals(
+            (
+                ordinal
+                for ordinal, record in enumerate(self._records)
+                if record is not None
+                and record.date_published is not None
+                and (start_date is None or record.date_published >= start_date)
+                and (end_date is None or record.date_published <= end_date)
+            ),
+            len(self._records),
+        )
+
+    def counts(
+        self,
+        include_sensitive: bool = False,
+        hit_ids: Optional[Iterable[int]] = None,
+        doc_type: Optional[str] = None,
+        department: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> dict:
+        with self._lock:
+            self._ensure_loaded()
+            if hit_ids is None and not (doc_type or department or start_date or end_date):
+                return {
+                    "total": self._totals[include_sensitive],
+                    **{
+                        name: dict(values)
+                        for name, values in self._global[include_sensitive].items()
+                    },
+                }
+
+            mask = self._live
+            if not include_sensitive:
+                mask &= ~self._sensitive
+            if doc_type:
+                mask &= self._bitsets["doc_type"].get(doc_type, 0)
+            if department:
+                mask &= self._bitsets["department"].get(department, 0)
+            if start_date or end_date:
+                mask &= self._date_mask(start_date, end_date)
+            if hit_ids is not None:
+                ordinals = (self._ordinals[doc_id] for doc_id in hit_ids if doc_id in self._ordinals)
+                mask &= _mask_from_ordinals(ordinals, len(self._records))
+
+            payload: dict = {"total": _popcount(mask)}
+            for name, bitsets in self._bitsets.items():
+                payload[name] = {}
+                for value, bits in bitsets.items():
+                    count = _popcount(mask & bits)
+                    if count:
+                        payload[name][value] = count
+            return payload
+
+
+facet_index = FacetIndex()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy.engine import Connection, Engine
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: tuple[str, ...]
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        description="Indexes for search filters, audit listing and sync job progress",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS ix_documents_type_dept_date "
+            "ON documents (doc_type, department, date_published, is_sensitive)",
+            "CREATE INDEX IF NOT EXISTS ix_documents_dept_date "
+            "ON documents (department, date_published, is_sensitive)",
+            "CREATE INDEX IF NOT EXISTS ix_documents_date_sensitive "
+            "ON documents (date_published, is_sensitive)",
+            "CREATE INDEX IF NOT EXISTS ix_documents_sensitive_date "
+            "ON documents (is_sensitive, date_published)",
+            "CREATE INDEX IF NOT EXISTS ix_audit_logs_timestamp_id "
+            "ON audit_logs (timestamp, id)",
+            "CREATE INDEX IF NOT EXISTS ix_audit_logs_user_timestamp "
+            "ON audit_logs (user_id, timestamp, id)",
+            "CREATE INDEX IF NOT EXISTS ix_audit_logs_action_timestamp "
+            "ON audit_logs (action, timestamp, id)",
+            "CREATE INDEX IF NOT EXISTS ix_sync_job_files_job_state "
+            "ON sync_job_files (job_id, state, id)",
+            "ANALYZE",
+        ),
+    ),
+    Migration(
+        version=2,
+        description="Index for bulk upload job progress",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS ix_bulk_job_files_job_status "
+            "ON bulk_job_files (job_id, status, id)",
+        ),
+    ),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(connection: Connection) -> int:
+    return int(connection.exec_driver_sql("PRAGMA user_version").scalar() or 0)
+
+
+def run_migrations(engine: Engine) -> list[int]:
+    applied: list[int] = []
+    with engine.begin() as connection:
+        current = schema_version(connection)
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            for statement in migration.statements:
+                connection.exec_driver_sql(statement)
+            connection.exec_driver_sql(f"PRAGMA user_version={migration.version}")
+            applied.append(migration.version)
+    return applied
+
+
+def explain_query_plan(connection: Connection, sql: str, parameters: tuple = ()) -> list[str]:
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    return [row[-1] for row in rows]
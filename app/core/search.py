@@ -1,16 +1,49 @@
 from __future__ import annotations
 
 import json
+import os
 import re
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 from rank_bm25 import BM25Okapi
 
 from app.core.config import INDEX_DIR, ensure_directories
 
-INDEX_FILE = INDEX_DIR / "index.json"
+INDEX_FILE_NAME = "index.json"
+INDEX_FILE = INDEX_DIR / INDEX_FILE_NAME
+CURRENT_FILE = INDEX_DIR / "CURRENT"
+LOCK_FILE = INDEX_DIR / "LOCK"
+GENERATIONS_DIR = INDEX_DIR / "generations"
+KEEP_GENERATIONS = 2
+
+_index_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_index() -> Iterator[None]:
+    with _index_lock:
+        if fcntl is None:
+            yield
+            return
+        LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with LOCK_FILE.open("a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 
 @dataclass
@@ -26,15 +59,30 @@ def _tokenize(text: str) -> list[str]:
     return re.findall(r"[a-z0-9]+", text.lower())
 
 
+def build_indexed_document(doc_id: str, title: str, content: str, tags: str) -> IndexedDocument:
+    tokens = _tokenize(f"{title} {tags} {content}")
+    return IndexedDocument(doc_id=doc_id, title=title, tags=tags, content=content, tokens=tokens)
+
+
+def active_index_file() -> Path:
+    try:
+        generation = CURRENT_FILE.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return INDEX_FILE
+    if not generation:
+        return INDEX_FILE
+    return GENERATIONS_DIR / generation / INDEX_FILE_NAME
+
+
 def ensure_index() -> None:
     ensure_directories()
-    if not INDEX_FILE.exists():
-        INDEX_FILE.write_text(json.dumps({"documents": []}), encoding="utf-8")
+    index_file = active_index_file()
+    if not index_file.exists():
+        _write_index_file(index_file, [])
 
 
-def _load_index() -> list[IndexedDocument]:
-    ensure_index()
-    payload = json.loads(INDEX_FILE.read_text(encoding="utf-8"))
+def _read_index_file(index_file: Path) -> list[IndexedDocument]:
+    payload = json.loads(index_file.read_text(encoding="utf-8"))
     documents = []
     for item in payload.get("documents", []):
         documents.append(
@@ -49,7 +97,7 @@ def _load_index() -> list[IndexedDocument]:
     return documents
 
 
-def _save_index(documents: list[IndexedDocument]) -> None:
+def _write_index_file(index_file: Path, documents: Iterable[IndexedDocument]) -> None:
     payload = {
         "documents": [
             {
@@ -62,16 +110,93 @@ def _save_index(documents: list[IndexedDocument]) -> None:
             for doc in documents
         ]
     }
-    INDEX_FILE.write_text(json.dumps(payload), encoding="utf-8")
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = index_file.with_name(f"{index_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp_file.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(temp_file, index_file)
+
+
+def _load_index() -> list[IndexedDocument]:
+    ensure_index()
+    return _read_index_file(active_index_file())
 
 
 def index_document(doc_id: str, title: str, content: str, tags: str) -> None:
-    documents = _load_index()
-    tokens = _tokenize(f"{title} {tags} {content}")
-    updated = IndexedDocument(doc_id=doc_id, title=title, tags=tags, content=content, tokens=tokens)
-    documents = [doc for doc in documents if doc.doc_id != doc_id]
-    documents.append(updated)
-    _save_index(documents)
+    index_documents([build_indexed_document(doc_id=doc_id, title=title, content=content, tags=tags)])
+
+
+def index_documents(updates: list[IndexedDocument]) -> None:
+    if not updates:
+        return
+    updated_ids = {doc.doc_id for doc in updates}
+    ensure_index()
+    with _locked_index():
+        index_file = active_index_file()
+        documents = [doc for doc in _read_index_file(index_file) if doc.doc_id not in updated_ids]
+        documents.extend(updates)
+        _write_index_file(index_file, documents)
+
+
+def build_index_generation(documents: Iterable[IndexedDocument]) -> Path:
+    name = f"{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}"
+    generation_dir = GENERATIONS_DIR / name
+    _write_index_file(generation_dir / INDEX_FILE_NAME, documents)
+    return generation_dir
+
+
+def _read_previous_index() -> list[IndexedDocument] | None:
+    try:
+        return _read_index_file(active_index_file())
+    except (ValueError, KeyError, TypeError, AttributeError, OSError):
+        return None
+
+
+def activate_index_generation(generation_dir: Path, valid_doc_ids: set[str] | None = None) -> int | None:
+    with _locked_index():
+        rebuilt = _read_index_file(generation_dir / INDEX_FILE_NAME)
+        carried: int | None = 0
+        if valid_doc_ids is not None and active_index_file().exists():
+            previous = _read_previous_index()
+            if previous is None:
+                carried = None
+            else:
+                rebuilt_ids = {doc.doc_id for doc in rebuilt}
+                for doc in previous:
+                    if doc.doc_id in valid_doc_ids and doc.doc_id not in rebuilt_ids:
+                        rebuilt.append(doc)
+                        carried += 1
+                if carried:
+                    _write_index_file(generation_dir / INDEX_FILE_NAME, rebuilt)
+
+        temp_file = CURRENT_FILE.with_name(f"{CURRENT_FILE.name}.tmp")
+        temp_file.write_text(generation_dir.name, encoding="utf-8")
+        os.replace(temp_file, CURRENT_FILE)
+
+    generations = sorted(path for path in GENERATIONS_DIR.iterdir() if path.is_dir())
+    for stale in generations[:-KEEP_GENERATIONS]:
+        if stale != generation_dir:
+            shutil.rmtree(stale, ignore_errors=True)
+    return carried
+
+
+def snapshot_index(target_dir: Path) -> list[tuple[str, Path]]:
+    with _locked_index():
+        index_file = active_index_file()
+        if not index_file.exists():
+            return []
+        relative = index_file.relative_to(INDEX_DIR)
+        snapshot = target_dir / relative
+        snapshot.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(index_file, snapshot)
+        except OSError:
+            shutil.copy2(index_file, snapshot)
+        entries = [(relative.as_posix(), snapshot)]
+        if index_file != INDEX_FILE:
+            current = target_dir / CURRENT_FILE.name
+            current.write_text(index_file.parent.name, encoding="utf-8")
+            entries.append((CURRENT_FILE.name, current))
+    return entries
 
 
 def _apply_boolean_filter(documents: Iterable[IndexedDocument], query: str) -> list[IndexedDocument]:
@@ -150,24 +275,44 @@ def _highlight_snippet(content: str, terms: list[str]) -> str:
     return highlighted
 
 
-def search_documents(query: str, limit: int = 10, allowed_ids: list[int] | None = None):
+def _allowed_documents(allowed_ids: list[int] | None) -> list[IndexedDocument]:
     documents = _load_index()
     if allowed_ids is not None:
         allowed_set = {str(doc_id) for doc_id in allowed_ids}
         documents = [doc for doc in documents if doc.doc_id in allowed_set]
+    return documents
 
-    filtered = _apply_boolean_filter(documents, query)
+
+def _matching(filtered: list[IndexedDocument], query: str) -> list[IndexedDocument]:
+    if any(token.upper() in {"AND", "OR", "NOT"} for token in query.split()):
+        return filtered
+    query_tokens = set(_tokenize(query))
+    return [doc for doc in filtered if query_tokens.intersection(doc.tokens)]
+
+
+def match_document_ids(query: str, allowed_ids: list[int] | None = None) -> set[str]:
+    filtered = _apply_boolean_filter(_allowed_documents(allowed_ids), query)
+    return {doc.doc_id for doc in _matching(filtered, query)}
+
+
+def _ranked(query: str, allowed_ids: list[int] | None) -> list[IndexedDocument]:
+    filtered = _apply_boolean_filter(_allowed_documents(allowed_ids), query)
     if not filtered:
         return []
 
-    corpus = [doc.tokens for doc in filtered]
-    bm25 = BM25Okapi(corpus)
-    query_tokens = _tokenize(query)
-    scores = bm25.get_scores(query_tokens)
-    ranked = sorted(zip(filtered, scores), key=lambda pair: pair[1], reverse=True)[:limit]
+    bm25 = BM25Okapi([doc.tokens for doc in filtered])
+    scores = bm25.get_scores(_tokenize(query))
+    return [doc for doc, _score in sorted(zip(filtered, scores), key=lambda pair: pair[1], reverse=True)]
 
+
+def rank_document_ids(query: str, allowed_ids: list[int] | None = None) -> list[str]:
+    return [doc.doc_id for doc in _ranked(query, allowed_ids)]
+
+
+def search_documents(query: str, limit: int = 10, allowed_ids: list[int] | None = None):
+    query_tokens = _tokenize(query)
     results_payload = []
-    for doc, _score in ranked:
+    for doc in _ranked(query, allowed_ids)[:limit]:
         results_payload.append(
             {
                 "doc_id": doc.doc_id,
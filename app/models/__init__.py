@@ -1,5 +1,8 @@
 from app.models.audit_log import AuditLog
+from app.models.bulk_job import BulkJob, BulkJobFile
 from app.models.document import Document
+from app.models.ingest_job import IngestJob
+from app.models.sync_job import SyncJob, SyncJobFile
 from app.models.user import User
 
-__all__ = ["AuditLog", "Document", "User"]
+__all__ = ["AuditLog", "BulkJob", "BulkJobFile", "Document", "IngestJob", "SyncJob", "SyncJobFile", "User"]
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.types import JSON
+
+from app.models.base import Base
+
+
+class BulkJob(Base):
+    __tablename__ = "bulk_jobs"
+
+    id = Column(String, primary_key=True)
+    job_metadata = Column("metadata", JSON, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(String, nullable=False, default="pending")
+    total_files = Column(Integer, nullable=False, default=0)
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class BulkJobFile(Base):
+    __tablename__ = "bulk_job_files"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String, ForeignKey("bulk_jobs.id"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    staged_path = Column(String, nullable=True)
+    file_hash = Column(String, nullable=True)
+    size = Column(BigInteger, nullable=False, default=0)
+    status = Column(String, nullable=False, default="pending")
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    error = Column(String, nullable=True)
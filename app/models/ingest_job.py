@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.types import JSON
+
+from app.models.base import Base
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String, primary_key=True)
+    filename = Column(String, nullable=False)
+    file_hash = Column(String, nullable=False, index=True)
+    size = Column(BigInteger, nullable=False, default=0)
+    staged_path = Column(String, nullable=False)
+    job_metadata = Column("metadata", JSON, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(String, nullable=False, default="pending")
+    stage = Column(String, nullable=False, default="queued")
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
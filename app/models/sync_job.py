@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.types import JSON
+
+from app.models.base import Base
+
+
+class SyncJob(Base):
+    __tablename__ = "sync_jobs"
+
+    id = Column(String, primary_key=True)
+    root_dir = Column(String, nullable=False)
+    job_metadata = Column("metadata", JSON, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(String, nullable=False, default="pending")
+    discovered = Column(Integer, nullable=False, default=0)
+    total_files = Column(Integer, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    processed_files = Column(Integer, nullable=False, default=0)
+    processed_bytes = Column(BigInteger, nullable=False, default=0)
+    ingested = Column(Integer, nullable=False, default=0)
+    duplicates = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class SyncJobFile(Base):
+    __tablename__ = "sync_job_files"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String, ForeignKey("sync_jobs.id"), nullable=False, index=True)
+    path = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False, default=0)
+    file_hash = Column(String, nullable=True)
+    state = Column(String, nullable=False, default="pending")
+    error = Column(String, nullable=True)
@@ -1,12 +1,176 @@
 from __future__ import annotations
 
-from typing import List
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional
 
 from ollama import Client
 
+from app.core.config import (
+    LLM_COOLDOWN_SECONDS,
+    LLM_FAILURE_THRESHOLD,
+    LLM_HOST,
+    LLM_MAX_CONCURRENCY,
+    LLM_MODEL,
+    LLM_TIMEOUT_SECONDS,
+)
 
-def _get_client() -> Client:
-    return Client(host="http://localhost:11434")
+
+class LLMUnavailableError(RuntimeError):
+    pass
+
+
+@dataclass
+class LLMMetrics:
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    rejected: int = 0
+    consecutive_failures: int = 0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+    last_error: Optional[str] = None
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, cooldown_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+class LLMClient:
+    def __init__(
+        self,
+        host: str,
+        model: str,
+        timeout: float,
+        max_concurrency: int,
+        breaker: CircuitBreaker,
+    ) -> None:
+        self.model = model
+        self.timeout = timeout
+        self.breaker = breaker
+        self._client = Client(host=host, timeout=timeout)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._metrics = LLMMetrics()
+        self._metrics_lock = threading.Lock()
+
+    def _reject(self, reason: str) -> LLMUnavailableError:
+        with self._metrics_lock:
+            self._metrics.rejected += 1
+        return LLMUnavailableError(reason)
+
+    def generate(self, prompt: str) -> str:
+        if not self.breaker.allow():
+            raise self._reject("LLM circuit open")
+        if not self._semaphore.acquire(timeout=self.timeout):
+            self.breaker.release_trial()
+            raise self._reject("LLM concurrency limit reached")
+        try:
+            start = time.perf_counter()
+            try:
+                response = self._client.generate(model=self.model, prompt=prompt)
+            except Exception as exc:
+                self.breaker.record_failure()
+                self._record(start, error=str(exc) or exc.__class__.__name__)
+                raise LLMUnavailableError(f"LLM request failed: {exc}") from exc
+            self.breaker.record_success()
+            self._record(start)
+        finally:
+            self._semaphore.release()
+        return response.get("response", "").strip()
+
+    def _record(self, start: float, error: Optional[str] = None) -> None:
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            metrics = self._metrics
+            metrics.requests += 1
+            metrics.total_latency_ms += latency_ms
+            metrics.max_latency_ms = max(metrics.max_latency_ms, latency_ms)
+            if error is None:
+                metrics.successes += 1
+                metrics.consecutive_failures = 0
+            else:
+                metrics.failures += 1
+                metrics.consecutive_failures += 1
+                metrics.last_error = error
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            payload = asdict(self._metrics)
+        requests = payload["requests"]
+        payload["avg_latency_ms"] = round(payload["total_latency_ms"] / requests, 2) if requests else 0.0
+        payload["circuit_state"] = self.breaker.state
+        return payload
+
+
+_client_lock = threading.Lock()
+_shared_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    global _shared_client
+    with _client_lock:
+        if _shared_client is None:
+            _shared_client = LLMClient(
+                host=LLM_HOST,
+                model=LLM_MODEL,
+                timeout=LLM_TIMEOUT_SECONDS,
+                max_concurrency=LLM_MAX_CONCURRENCY,
+                breaker=CircuitBreaker(LLM_FAILURE_THRESHOLD, LLM_COOLDOWN_SECONDS),
+            )
+        return _shared_client
+
+
+def llm_metrics() -> dict:
+    return get_llm_client().metrics()
 
 
 def summarize_document(text: str) -> List[str]:
@@ -15,9 +179,7 @@ def summarize_document(text: str) -> List[str]:
         "Return only the bullet points.\n\n"
         f"{text}"
     )
-    client = _get_client()
-    response = client.generate(model="llama3.2", prompt=prompt)
-    raw = response.get("response", "").strip()
+    raw = get_llm_client().generate(prompt)
     return [line.strip("- ") for line in raw.splitlines() if line.strip()][:3]
 
 
@@ -27,7 +189,5 @@ def extract_key_dates(text: str) -> List[str]:
         "Return a bullet list of dates or deadlines. If none, return an empty list.\n\n"
         f"{text}"
     )
-    client = _get_client()
-    response = client.generate(model="llama3.2", prompt=prompt)
-    raw = response.get("response", "").strip()
+    raw = get_llm_client().generate(prompt)
     return [line.strip("- ") for line in raw.splitlines() if line.strip()]
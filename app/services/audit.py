@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import (
+    AUDIT_BUFFER_LIMIT,
+    AUDIT_FLUSH_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL_SECONDS,
+    AUDIT_STRICT_SYNC,
+)
+from app.core.database import SessionLocal
+from app.models.audit_log import AuditLog
+
+
+@dataclass
+class AuditEntry:
+    user_id: int
+    action: str
+    target_id: Optional[int] = None
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+
+class AuditSink:
+    def __init__(
+        self,
+        batch_size: int = AUDIT_FLUSH_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        buffer_limit: int = AUDIT_BUFFER_LIMIT,
+        strict: bool = AUDIT_STRICT_SYNC,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer_limit = buffer_limit
+        self.strict = strict
+        self._buffer: list[AuditEntry] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopping = False
+        self._paused = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def record(self, user_id: int, action: str, target_id: Optional[int] = None) -> None:
+        entry = AuditEntry(user_id=user_id, action=action, target_id=target_id)
+        if (self.strict or not self.running) and not self._paused:
+            self._write([entry])
+            return
+        with self._condition:
+            self._buffer.append(entry)
+            pending = len(self._buffer)
+            if pending >= self.batch_size:
+                self._condition.notify()
+        if pending >= self.buffer_limit:
+            self.flush()
+
+    def start(self) -> None:
+        if self.strict or self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush()
+
+    def pause(self) -> None:
+        with self._flush_lock:
+            self._paused = True
+
+    def resume(self) -> None:
+        self._paused = False
+        if self.running:
+            with self._condition:
+                self._condition.notify()
+        else:
+            self.flush()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            if self._paused:
+                return 0
+            with self._condition:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+            try:
+                self._write(entries)
+            except Exception:
+                with self._condition:
+                    self._buffer[:0] = entries
+                raise
+            return len(entries)
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._buffer)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._buffer) < self.batch_size:
+                    self._condition.wait(timeout=self.flush_interval)
+                stopping = self._stopping
+            try:
+                self.flush()
+            except Exception:
+                pass
+            if stopping:
+                return
+
+    def _write(self, entries: list[AuditEntry]) -> None:
+        db = SessionLocal()
+        try:
+            db.add_all(
+                [
+                    AuditLog(
+                        user_id=entry.user_id,
+                        action=entry.action,
+                        target_id=entry.target_id,
+                        timestamp=entry.timestamp,
+                    )
+                    for entry in entries
+                ]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+audit_sink = AuditSink()
+
+
+def record_audit(user_id: int, action: str, target_id: Optional[int] = None) -> None:
+    audit_sink.record(user_id, action, target_id)
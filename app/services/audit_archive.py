@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import gzip
+import heapq
+import json
+import os
+import shutil
+import threading
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from app.core.config import (
+    AUDIT_ARCHIVE_BATCH_SIZE,
+    AUDIT_ARCHIVE_DIR,
+    AUDIT_ARCHIVE_INTERVAL_SECONDS,
+    AUDIT_RETENTION_DAYS,
+)
+from app.core.database import SessionLocal
+from app.models.audit_log import AuditLog
+from app.models.document import Document
+from app.models.user import User
+
+_stop_event = threading.Event()
+_thread: Optional[threading.Thread] = None
+_segment_lock = threading.Lock()
+
+
+def _segment_path(day: date) -> Path:
+    return AUDIT_ARCHIVE_DIR / f"{day.year:04d}" / f"audit-{day.isoformat()}.jsonl.gz"
+
+
+def _counts_path(segment: Path) -> Path:
+    return segment.with_name(segment.name.replace(".jsonl.gz", ".counts.json"))
+
+
+def _segment_day(path: Path) -> Optional[date]:
+    try:
+        return date.fromisoformat(path.name[len("audit-") : -len(".jsonl.gz")])
+    except ValueError:
+        return None
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _count_key(record: dict) -> str:
+    return json.dumps([record.get("user"), record["action"]])
+
+
+def _write_counts(path: Path, counts: Counter, last_ids: Iterable[int] = ()) -> None:
+    target = _counts_path(path)
+    temp_file = target.with_name(f"{target.name}.tmp")
+    temp_file.write_text(json.dumps({"counts": dict(counts), "last_ids": sorted(last_ids)}), encoding="utf-8")
+    os.replace(temp_file, target)
+
+
+def _read_counts(path: Path) -> Optional[tuple[Counter, set[int]]]:
+    try:
+        stat = path.stat()
+        counts_path = _counts_path(path)
+        if counts_path.stat().st_mtime_ns < stat.st_mtime_ns:
+            return None
+        payload = json.loads(counts_path.read_text(encoding="utf-8"))
+        return Counter(payload["counts"]), set(payload["last_ids"])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+
+
+def _append_segment(day: date, records: list[dict]) -> None:
+    with _segment_lock:
+        _append_locked(day, records)
+
+
+def _append_locked(day: date, records: list[dict]) -> None:
+    path = _segment_path(day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sidecar = _read_counts(path) if path.exists() else (Counter(), set())
+    if sidecar is not None:
+        records = [record for record in records if record["id"] not in sidecar[1]]
+        if not records:
+            return
+    with open(path, "ab") as raw_file:
+        with gzip.GzipFile(fileobj=raw_file, mode="wb") as out_file:
+            for record in records:
+                out_file.write(json.dumps(record).encode("utf-8") + b"\n")
+        raw_file.flush()
+        os.fsync(raw_file.fileno())
+    batch_ids = [record["id"] for record in records]
+    if sidecar is None:
+        _segment_counts(path, batch_ids)
+        return
+    counts = sidecar[0]
+    counts.update(_count_key(record) for record in records)
+    _write_counts(path, counts, batch_ids)
+
+
+def snapshot_audit_archive(target_dir: Path) -> list[tuple[str, Path]]:
+    entries = []
+    with _segment_lock:
+        if not AUDIT_ARCHIVE_DIR.exists():
+            return entries
+        for path in AUDIT_ARCHIVE_DIR.rglob("*.jsonl.gz"):
+            if not path.is_file():
+                continue
+            relative = path.relative_to(AUDIT_ARCHIVE_DIR)
+            snapshot = target_dir / relative
+            snapshot.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, snapshot)
+            entries.append((relative.as_posix(), snapshot))
+    return entries
+
+
+def archive_audit_logs(retention_days: int = AUDIT_RETENTION_DAYS, now: Optional[datetime] = None) -> int:
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    archived = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = (
+                db.query(
+                    AuditLog.id,
+                    AuditLog.timestamp,
+                    AuditLog.user_id,
+                    AuditLog.action,
+                    AuditLog.target_id,
+                    User.username,
+                    Document.filename,
+                )
+                .outerjoin(User, User.id == AuditLog.user_id)
+                .outerjoin(Document, Document.id == AuditLog.target_id)
+                .filter(AuditLog.timestamp < cutoff)
+                .order_by(AuditLog.timestamp, AuditLog.id)
+                .limit(AUDIT_ARCHIVE_BATCH_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+
+            segments: dict[date, list[dict]] = defaultdict(list)
+            for row in rows:
+                segments[row.timestamp.date()].append(
+                    {
+                        "id": row.id,
+                        "timestamp": row.timestamp.isoformat(),
+                        "user_id": row.user_id,
+                        "user": row.username,
+                        "action": row.action,
+                        "target_id": row.target_id,
+                        "target_file": row.filename,
+                    }
+                )
+            for day, records in segments.items():
+                _append_segment(day, records)
+
+            db.query(AuditLog).filter(AuditLog.id.in_([row.id for row in rows])).delete(
+                synchronize_session=False
+            )
+            db.commit()
+            archived += len(rows)
+    finally:
+        db.close()
+    return archived
+
+
+def _stream_segment(path: Path) -> Iterator[dict]:
+    with gzip.open(path, "rt", encoding="utf-8") as in_file:
+        for line in in_file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record["timestamp"] = _to_utc(datetime.fromisoformat(record["timestamp"]))
+            yield record
+
+
+def _segment_counts(path: Path, last_ids: Iterable[int] = ()) -> Counter:
+    sidecar = _read_counts(path)
+    if sidecar is not None:
+        return sidecar[0]
+    seen: set[int] = set()
+    counts = Counter()
+    for record in _stream_segment(path):
+        if record["id"] not in seen:
+            seen.add(record["id"])
+            counts[_count_key(record)] += 1
+    _write_counts(path, counts, last_ids)
+    return counts
+
+
+def _segments(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    cursor: Optional[tuple[datetime, int]] = None,
+) -> list[tuple[date, Path]]:
+    if not AUDIT_ARCHIVE_DIR.exists():
+        return []
+    segments = []
+    for path in AUDIT_ARCHIVE_DIR.glob("*/audit-*.jsonl.gz"):
+        day = _segment_day(path)
+        if day is None:
+            continue
+        if start and day < start.date():
+            continue
+        if end and day > end.date():
+            continue
+        if cursor and day > cursor[0].date():
+            continue
+        segments.append((day, path))
+    return sorted(segments, reverse=True)
+
+
+def _matching(
+    records: Iterable[dict],
+    user: Optional[str],
+    action: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    cursor: Optional[tuple[datetime, int]] = None,
+) -> Iterator[dict]:
+    for record in records:
+        if cursor and (record["timestamp"], record["id"]) >= cursor:
+            continue
+        if start and record["timestamp"] < start:
+            continue
+        if end and record["timestamp"] > end:
+            continue
+        if user and record.get("user") != user:
+            continue
+        if action and record["action"] != action:
+            continue
+        yield record
+
+
+def _newest(records: Iterable[dict], limit: int) -> list[dict]:
+    heap: list[tuple[tuple[datetime, int], dict]] = []
+    kept: set[tuple[datetime, int]] = set()
+    for record in records:
+        key = (record["timestamp"], record["id"])
+        if key in kept:
+            continue
+        if len(heap) < limit:
+            heapq.heappush(heap, (key, record))
+            kept.add(key)
+        elif key > heap[0][0]:
+            dropped, _ = heapq.heapreplace(heap, (key, record))
+            kept.discard(dropped)
+            kept.add(key)
+    return [record for _key, record in sorted(heap, key=lambda item: item[0], reverse=True)]
+
+
+def archived_logs_page(
+    user: Optional[str] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[tuple[datetime, int]] = None,
+    limit: int = 25,
+) -> list[dict]:
+    start = _to_utc(start) if start else None
+    end = _to_utc(end) if end else None
+    cursor = (_to_utc(cursor[0]), cursor[1]) if cursor else None
+    page: list[dict] = []
+    for _day, path in _segments(start, end, cursor):
+        matches = _matching(_stream_segment(path), user, action, start, end, cursor)
+        page.extend(_newest(matches, limit - len(page)))
+        if len(page) >= limit:
+            break
+    return page
+
+
+def count_archived_logs(
+    user: Optional[str] = None,
+    action: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> int:
+    start = _to_utc(start) if start else None
+    end = _to_utc(end) if end else None
+    total = 0
+    for day, path in _segments(start, end):
+        whole_day = (start is None or start <= datetime.combine(day, time.min)) and (
+            end is None or end >= datetime.combine(day, time.max)
+        )
+        if whole_day:
+            for key, count in _segment_counts(path).items():
+                record_user, record_action = json.loads(key)
+                if (not user or record_user == user) and (not action or record_action == action):
+                    total += count
+            continue
+        seen: set[int] = set()
+        for record in _matching(_stream_segment(path), user, action, start, end):
+            if record["id"] not in seen:
+                seen.add(record["id"])
+                total += 1
+    return total
+
+
+def _retention_loop() -> None:
+    while not _stop_event.is_set():
+        try:
+            archive_audit_logs()
+        except Exception:
+            pass
+        if _stop_event.wait(AUDIT_ARCHIVE_INTERVAL_SECONDS):
+            return
+
+
+def start_audit_retention() -> None:
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop_event.clear()
+    _thread = threading.Thread(target=_retention_loop, name="audit-retention", daemon=True)
+    _thread.start()
+
+
+def is_retention_running() -> bool:
+    return _thread is not None and _thread.is_alive()
+
+
+def stop_audit_retention(timeout: float = 5.0) -> bool:
+    global _thread
+    _stop_event.set()
+    if _thread is None:
+        return True
+    _thread.join(timeout=timeout)
+    if _thread.is_alive():
+        return False
+    _thread = None
+    return True
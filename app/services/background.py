@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable
+
+from app.core.config import RESTORE_DRAIN_TIMEOUT_SECONDS
+
+
+class BackgroundWriters:
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._active = 0
+        self._paused = False
+
+    @property
+    def active(self) -> int:
+        with self._condition:
+            return self._active
+
+    def run(self, task: Callable[..., Any], *args: Any) -> Any:
+        with self._condition:
+            if self._paused:
+                return None
+            self._active += 1
+        try:
+            return task(*args)
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def pause(self, timeout: float = RESTORE_DRAIN_TIMEOUT_SECONDS) -> bool:
+        with self._condition:
+            self._paused = True
+            return self._condition.wait_for(lambda: self._active == 0, timeout=timeout)
+
+    def resume(self) -> None:
+        with self._condition:
+            self._paused = False
+
+
+background_writers = BackgroundWriters()
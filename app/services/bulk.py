@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    BULK_MAX_EXPANDED_BYTES,
+    BULK_MAX_FILES,
+    BULK_MAX_ZIP_ENTRIES,
+    BULK_WORKERS,
+    INGEST_BATCH_SIZE,
+)
+from app.core.database import SessionLocal
+from app.models.bulk_job import BulkJob, BulkJobFile
+from app.models.document import Document
+from app.models.ingest_job import IngestJob
+from app.services.ingest_jobs import ACTIVE_STATUSES, submit_ingest_task
+from app.services.ingestion import PreparedDocument, ingest_batch, prepare_document
+from app.services.storage import StagedFile, stream_to_temp
+from app.services.sync import deserialize_metadata, serialize_metadata
+
+
+@dataclass
+class BulkItem:
+    filename: str
+    staged: Optional[StagedFile] = None
+    status: str = "pending"
+    document_id: Optional[int] = None
+    error: Optional[str] = None
+    file_id: Optional[int] = None
+
+    def discard(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        if self.staged is not None:
+            self.staged.path.unlink(missing_ok=True)
+
+
+def _is_pdf(name: str) -> bool:
+    return name.lower().endswith(".pdf")
+
+
+def _stage_zip(source: BinaryIO, items: List[BulkItem]) -> None:
+    with zipfile.ZipFile(source) as archive:
+        entries = archive.infolist()
+        if len(entries) > BULK_MAX_ZIP_ENTRIES:
+            raise ValueError(f"ZIP archives are limited to {BULK_MAX_ZIP_ENTRIES} entries")
+        if sum(info.file_size for info in entries) > BULK_MAX_EXPANDED_BYTES:
+            raise ValueError(f"ZIP archives are limited to {BULK_MAX_EXPANDED_BYTES} bytes uncompressed")
+        for info in entries:
+            name = Path(info.filename).name
+            if info.is_dir() or info.filename.startswith("__MACOSX/") or name.startswith("."):
+                continue
+            if not _is_pdf(name):
+                items.append(BulkItem(filename=name, status="skipped", error="Not a PDF"))
+                continue
+            if len(items) >= BULK_MAX_FILES:
+                raise ValueError(f"Bulk uploads are limited to {BULK_MAX_FILES} files")
+            with archive.open(info) as entry:
+                items.append(BulkItem(filename=name, staged=stream_to_temp(entry)))
+
+
+def stage_uploads(uploads: Iterable[tuple[str, BinaryIO]]) -> List[BulkItem]:
+    items: List[BulkItem] = []
+    try:
+        for filename, source in uploads:
+            if filename.lower().endswith(".zip") or (not _is_pdf(filename) and zipfile.is_zipfile(source)):
+                source.seek(0)
+                try:
+                    _stage_zip(source, items)
+                except zipfile.BadZipFile:
+                    items.append(BulkItem(filename=filename, status="failed", error="Invalid ZIP archive"))
+                continue
+            source.seek(0)
+            if not _is_pdf(filename):
+                items.append(BulkItem(filename=filename, status="skipped", error="Not a PDF"))
+                continue
+            if len(items) >= BULK_MAX_FILES:
+                raise ValueError(f"Bulk uploads are limited to {BULK_MAX_FILES} files")
+            items.append(BulkItem(filename=filename, staged=stream_to_temp(source)))
+    except BaseException:
+        for item in items:
+            if item.staged is not None:
+                item.staged.path.unlink(missing_ok=True)
+        raise
+    return items
+
+
+def mark_duplicates(db: Session, items: List[BulkItem]) -> None:
+    pending = [item for item in items if item.status == "pending"]
+    hashes = {item.staged.file_hash for item in pending}
+    if not hashes:
+        return
+    existing = {
+        row.file_hash for row in db.query(Document.file_hash).filter(Document.file_hash.in_(hashes))
+    }
+    existing.update(
+        row.file_hash
+        for row in db.query(IngestJob.file_hash).filter(
+            IngestJob.file_hash.in_(hashes), IngestJob.status.in_(ACTIVE_STATUSES)
+        )
+    )
+    seen: set[str] = set()
+    for item in pending:
+        file_hash = item.staged.file_hash
+        if file_hash in existing or file_hash in seen:
+            item.discard("duplicate", "Duplicate document detected")
+        seen.add(file_hash)
+
+
+def _commit(db: Session, batch: List[tuple[BulkItem, PreparedDocument]], user_id: Optional[int]) -> None:
+    if not batch:
+        return
+    try:
+        ingest_batch(db, [prepared for _, prepared in batch], user_id=user_id)
+    except Exception as exc:
+        db.rollback()
+        for item, _ in batch:
+            item.status = "failed"
+            item.error = str(exc) or exc.__class__.__name__
+        return
+    for item, prepared in batch:
+        item.document_id = prepared.doc_id
+        item.status = "ingested" if prepared.doc_id is not None else "duplicate"
+
+
+def ingest_bulk(
+    db: Session,
+    items: List[BulkItem],
+    metadata: Dict[str, object],
+    user_id: Optional[int] = None,
+    on_settled: Optional[Callable[[List[BulkItem]], None]] = None,
+) -> List[BulkItem]:
+    def settle(settled: List[BulkItem]) -> None:
+        if on_settled is not None and settled:
+            on_settled(settled)
+
+    mark_duplicates(db, items)
+    settle([item for item in items if item.status == "duplicate"])
+    pending = [item for item in items if item.status == "pending"]
+    with ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix="bulk") as pool:
+        futures = {
+            pool.submit(
+                prepare_document,
+                item.staged.path.as_posix(),
+                item.filename,
+                dict(metadata),
+                file_hash=item.staged.file_hash,
+            ): item
+            for item in pending
+        }
+        batch: List[tuple[BulkItem, PreparedDocument]] = []
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                batch.append((item, future.result()))
+            except Exception as exc:
+                item.discard("failed", str(exc) or exc.__class__.__name__)
+                settle([item])
+                continue
+            if len(batch) >= INGEST_BATCH_SIZE:
+                _commit(db, batch, user_id)
+                settle([item for item, _ in batch])
+                batch = []
+        _commit(db, batch, user_id)
+        settle([item for item, _ in batch])
+    return items
+
+
+def create_bulk_job(
+    db: Session,
+    items: List[BulkItem],
+    metadata: Dict[str, object],
+    user_id: Optional[int] = None,
+) -> BulkJob:
+    job = BulkJob(
+        id=uuid.uuid4().hex,
+        job_metadata=serialize_metadata(metadata),
+        user_id=user_id,
+        status="pending",
+        total_files=len(items),
+    )
+    db.add(job)
+    db.add_all(
+        BulkJobFile(
+            job_id=job.id,
+            filename=item.filename,
+            staged_path=item.staged.path.as_posix() if item.staged else None,
+            file_hash=item.staged.file_hash if item.staged else None,
+            size=item.staged.size if item.staged else 0,
+            status=item.status,
+            error=item.error,
+        )
+        for item in items
+    )
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_bulk_job(db: Session, job_id: str) -> Optional[BulkJob]:
+    return db.query(BulkJob).filter(BulkJob.id == job_id).first()
+
+
+def submit_bulk_job(job_id: str) -> None:
+    submit_ingest_task(run_bulk_job, job_id)
+
+
+def _pending_files(db: Session, job: BulkJob) -> List[BulkJobFile]:
+    return (
+        db.query(BulkJobFile)
+        .filter(BulkJobFile.job_id == job.id, BulkJobFile.status == "pending")
+        .order_by(BulkJobFile.id)
+        .all()
+    )
+
+
+def _settle_missing(db: Session, job_file: BulkJobFile) -> None:
+    document = db.query(Document.id).filter(Document.file_hash == job_file.file_hash).first()
+    if document:
+        job_file.status = "ingested"
+        job_file.document_id = document.id
+    else:
+        job_file.status = "failed"
+        job_file.error = "Interrupted after the staged upload was moved"
+
+
+def run_bulk_job(job_id: str) -> None:
+    db = SessionLocal()
+    ingest_db = SessionLocal()
+    try:
+        job = get_bulk_job(db, job_id)
+        if job is None or job.status != "pending":
+            return
+        run_start = time.monotonic()
+        elapsed_before = job.elapsed_seconds or 0.0
+        job.status = "running"
+        db.commit()
+
+        files: Dict[int, BulkJobFile] = {}
+        items: List[BulkItem] = []
+        for job_file in _pending_files(db, job):
+            staged_path = Path(job_file.staged_path)
+            if not staged_path.exists():
+                _settle_missing(db, job_file)
+                continue
+            files[job_file.id] = job_file
+            items.append(
+                BulkItem(
+                    filename=job_file.filename,
+                    staged=StagedFile(path=staged_path, file_hash=job_file.file_hash, size=job_file.size),
+                    file_id=job_file.id,
+                )
+            )
+        db.commit()
+
+        def checkpoint(settled: List[BulkItem]) -> None:
+            for item in settled:
+                job_file = files[item.file_id]
+                job_file.status = item.status
+                job_file.document_id = item.document_id
+                job_file.error = item.error
+            job.elapsed_seconds = elapsed_before + time.monotonic() - run_start
+            job.updated_at = datetime.utcnow()
+            db.commit()
+
+        try:
+            ingest_bulk(
+                ingest_db,
+                items,
+                deserialize_metadata(job.job_metadata),
+                user_id=job.user_id,
+                on_settled=checkpoint,
+            )
+            job.status = "completed"
+        except Exception as exc:
+            db.rollback()
+            error = str(exc) or exc.__class__.__name__
+            for job_file in _pending_files(db, job):
+                Path(job_file.staged_path).unlink(missing_ok=True)
+                job_file.status = "failed"
+                job_file.error = error
+            job.status = "failed"
+            job.error = error
+        job.elapsed_seconds = elapsed_before + time.monotonic() - run_start
+        job.updated_at = datetime.utcnow()
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        ingest_db.close()
+        db.close()
+
+
+def resume_bulk_jobs() -> int:
+    db = SessionLocal()
+    try:
+        jobs = db.query(BulkJob).filter(BulkJob.status.in_(ACTIVE_STATUSES)).all()
+        for job in jobs:
+            job.status = "pending"
+            job.updated_at = datetime.utcnow()
+        db.commit()
+        resumed = [job.id for job in jobs]
+    finally:
+        db.close()
+    for job_id in resumed:
+        submit_bulk_job(job_id)
+    return len(resumed)
+
+
+def bulk_job_report(db: Session, job: BulkJob) -> dict:
+    counts = dict(
+        db.query(BulkJobFile.status, func.count(BulkJobFile.id))
+        .filter(BulkJobFile.job_id == job.id)
+        .group_by(BulkJobFile.status)
+        .all()
+    )
+    files = db.query(BulkJobFile).filter(BulkJobFile.job_id == job.id).order_by(BulkJobFile.id).all()
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": job.total_files,
+        "pending": counts.get("pending", 0),
+        "ingested": counts.get("ingested", 0),
+        "duplicates": counts.get("duplicate", 0),
+        "failed": counts.get("failed", 0),
+        "skipped": counts.get("skipped", 0),
+        "elapsed_seconds": round(job.elapsed_seconds or 0.0, 2),
+        "items": [
+            {
+                "filename": job_file.filename,
+                "status": job_file.status,
+                "file_hash": job_file.file_hash,
+                "document_id": job_file.document_id,
+                "error": job_file.error,
+            }
+            for job_file in files
+        ],
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
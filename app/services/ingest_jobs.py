@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import INGEST_WORKERS
+from app.core.database import SessionLocal
+from app.models.document import Document
+from app.models.ingest_job import IngestJob
+from app.services.ingestion import ingest_batch, prepare_document
+from app.services.storage import StagedFile
+from app.services.sync import deserialize_metadata, serialize_metadata
+
+INGEST_STAGES = ("queued", "extracting", "summarizing", "storing", "indexing", "done")
+ACTIVE_STATUSES = {"pending", "running"}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+        return _executor
+
+
+def shutdown_ingest_executor(wait: bool = False) -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def is_ingest_pending(db: Session, file_hash: str) -> bool:
+    return (
+        db.query(IngestJob.id)
+        .filter(IngestJob.file_hash == file_hash, IngestJob.status.in_(ACTIVE_STATUSES))
+        .first()
+        is not None
+    )
+
+
+def create_ingest_job(
+    db: Session,
+    staged: StagedFile,
+    filename: str,
+    metadata: Dict[str, object],
+    user_id: Optional[int] = None,
+) -> IngestJob:
+    job = IngestJob(
+        id=uuid.uuid4().hex,
+        filename=filename,
+        file_hash=staged.file_hash,
+        size=staged.size,
+        staged_path=staged.path.as_posix(),
+        job_metadata=serialize_metadata(metadata),
+        user_id=user_id,
+        status="pending",
+        stage="queued",
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_ingest_job(db: Session, job_id: str) -> Optional[IngestJob]:
+    return db.query(IngestJob).filter(IngestJob.id == job_id).first()
+
+
+def submit_ingest_task(task: Callable[[str], None], job_id: str) -> None:
+    _get_executor().submit(task, job_id)
+
+
+def submit_ingest_job(job_id: str) -> None:
+    submit_ingest_task(run_ingest_job, job_id)
+
+
+def _finish(db: Session, job: IngestJob, status: str, error: Optional[str] = None) -> None:
+    job.status = status
+    job.error = error
+    if status == "completed":
+        job.stage = "done"
+    job.updated_at = datetime.utcnow()
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+
+def run_ingest_job(job_id: str) -> None:
+    db = SessionLocal()
+    ingest_db = SessionLocal()
+    try:
+        job = get_ingest_job(db, job_id)
+        if job is None or job.status != "pending":
+            return
+        staged_path = Path(job.staged_path)
+        if not staged_path.exists():
+            _finish(db, job, "failed", "Staged upload is missing")
+            return
+
+        run_start = time.monotonic()
+
+        def on_stage(stage: str) -> None:
+            job.stage = stage
+            job.elapsed_seconds = time.monotonic() - run_start
+            job.updated_at = datetime.utcnow()
+            db.commit()
+
+        job.status = "running"
+        db.commit()
+        try:
+            prepared = prepare_document(
+                staged_path.as_posix(),
+                job.filename,
+                deserialize_metadata(job.job_metadata),
+                file_hash=job.file_hash,
+                on_stage=on_stage,
+            )
+            on_stage("indexing")
+            documents = ingest_batch(ingest_db, [prepared], user_id=job.user_id)
+        except Exception as exc:
+            ingest_db.rollback()
+            db.rollback()
+            staged_path.unlink(missing_ok=True)
+            job.elapsed_seconds = time.monotonic() - run_start
+            status = "duplicate" if job.stage == "indexing" and isinstance(exc, ValueError) else "failed"
+            _finish(db, job, status, str(exc) or exc.__class__.__name__)
+            return
+
+        job.elapsed_seconds = time.monotonic() - run_start
+        if not documents:
+            _finish(db, job, "duplicate", "Duplicate document detected")
+            return
+        job.document_id = documents[0].id
+        _finish(db, job, "completed")
+    finally:
+        ingest_db.close()
+        db.close()
+
+
+def resume_ingest_jobs() -> int:
+    db = SessionLocal()
+    try:
+        jobs = db.query(IngestJob).filter(IngestJob.status.in_(ACTIVE_STATUSES)).all()
+        resumed = []
+        for job in jobs:
+            if Path(job.staged_path).exists():
+                job.status = "pending"
+                job.stage = "queued"
+                job.updated_at = datetime.utcnow()
+                resumed.append(job.id)
+                continue
+            document = db.query(Document.id).filter(Document.file_hash == job.file_hash).first()
+            if document:
+                job.document_id = document.id
+                _finish(db, job, "completed")
+            else:
+                _finish(db, job, "failed", "Interrupted after the staged upload was moved")
+        db.commit()
+    finally:
+        db.close()
+    for job_id in resumed:
+        submit_ingest_job(job_id)
+    return len(resumed)
+
+
+def ingest_job_report(job: IngestJob) -> dict:
+    stage_index = INGEST_STAGES.index(job.stage) if job.stage in INGEST_STAGES else 0
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": round(stage_index / (len(INGEST_STAGES) - 1), 2),
+        "filename": job.filename,
+        "file_hash": job.file_hash,
+        "size": job.size,
+        "document_id": job.document_id,
+        "elapsed_seconds": round(job.elapsed_seconds or 0.0, 2),
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
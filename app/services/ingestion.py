@@ -1,66 +1,219 @@
+from dataclasses import dataclass
 from datetime import date
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.search import index_document
+from app.core.database import SessionLocal
+from app.core.facets import FacetRecord, facet_index
+from app.core.search import build_indexed_document, index_documents
 from app.models.audit_log import AuditLog
 from app.models.document import Document
-from app.services.analysis import summarize_document
-from app.services.pdf import extract_text
-from app.services.storage import compute_sha256, move_to_storage
+from app.services.analysis import LLMUnavailableError, summarize_document
+from app.services.pdf import extract_pages
+from app.services.renders import prerender_thumbnail
+from app.services.storage import compute_sha256, copy_to_storage, move_to_storage
+from app.services.text_store import get_text, refresh_stale, save_extraction
 
 
-def ingest_file(
-    db: Session,
+@dataclass
+class PreparedDocument:
+    filename: str
+    file_hash: str
+    stored_path: str
+    text: str
+    metadata: Dict[str, Any]
+    summary: Optional[List[str]] = None
+    doc_id: Optional[int] = None
+
+
+def format_tags(tags: Any) -> str:
+    return ",".join(tags) if isinstance(tags, list) else (tags or "")
+
+
+def prepare_document(
     file_path: str,
     filename: str,
     metadata: Dict[str, Any],
-    user_id: Optional[int] = None,
-) -> Document:
-    file_hash = compute_sha256(file_path)
-    existing = db.query(Document).filter(Document.file_hash == file_hash).first()
-    if existing:
-        raise ValueError("Duplicate document detected")
+    file_hash: Optional[str] = None,
+    on_stage: Optional[Callable[[str], None]] = None,
+    keep_source: bool = False,
+) -> PreparedDocument:
+    report = on_stage or (lambda _stage: None)
+    file_hash = file_hash or compute_sha256(file_path)
+    report("extracting")
+    extraction = extract_pages(file_path)
+    save_extraction(file_hash, extraction)
+    text = extraction.text
 
-    text = extract_text(file_path)
-    stored_path = move_to_storage(file_path, file_hash)
+    report("summarizing")
+    try:
+        summary = summarize_document(text)
+    except Exception:
+        summary = None
 
-    document = Document(
+    report("storing")
+    store = copy_to_storage if keep_source else move_to_storage
+    stored_path = store(file_path, file_hash)
+    prerender_thumbnail(file_hash, stored_path)
+    return PreparedDocument(
         filename=filename,
-        file_path=stored_path,
         file_hash=file_hash,
-        doc_type=metadata.get("doc_type", "Unknown"),
-        department=metadata.get("department"),
-        date_published=metadata.get("date_published"),
-        tags=metadata.get("tags"),
-        is_sensitive=metadata.get("is_sensitive", False),
-    )
-    db.add(document)
-    db.commit()
-    db.refresh(document)
-
-    index_document(
-        doc_id=str(document.id),
-        title=document.filename,
-        content=text,
-        tags=",".join(document.tags) if isinstance(document.tags, list) else (document.tags or ""),
+        stored_path=stored_path,
+        text=text,
+        metadata=metadata,
+        summary=summary,
     )
 
+
+def persist_documents(
+    db: Session,
+    prepared: List[PreparedDocument],
+    user_id: Optional[int] = None,
+) -> List[Document]:
+    existing = {
+        row.file_hash
+        for row in db.query(Document.file_hash).filter(
+            Document.file_hash.in_([item.file_hash for item in prepared])
+        )
+    }
+    accepted: List[PreparedDocument] = []
+    documents: List[Document] = []
+    for item in prepared:
+        if item.file_hash in existing:
+            continue
+        existing.add(item.file_hash)
+        accepted.append(item)
+        document = Document(
+            filename=item.filename,
+            file_path=item.stored_path,
+            file_hash=item.file_hash,
+            doc_type=item.metadata.get("doc_type", "Unknown"),
+            department=item.metadata.get("department"),
+            date_published=item.metadata.get("date_published"),
+            tags=item.metadata.get("tags"),
+            is_sensitive=item.metadata.get("is_sensitive", False),
+        )
+        if item.summary is not None:
+            document.ai_summary = item.summary
+        documents.append(document)
+    if not documents:
+        return []
+
     try:
-        summary = summarize_document(text)
-        document.ai_summary = summary
-        db.add(document)
+        db.add_all(documents)
+        db.flush()
+        for item, document in zip(accepted, documents):
+            item.doc_id = document.id
+        if user_id is not None:
+            db.add_all(
+                [AuditLog(user_id=user_id, action="upload", target_id=document.id) for document in documents]
+            )
         db.commit()
-    except Exception:
+    except IntegrityError as exc:
         db.rollback()
+        for item in accepted:
+            item.doc_id = None
+        raise ValueError("Duplicate document detected") from exc
+    return documents
 
-    if user_id is not None:
-        audit = AuditLog(user_id=user_id, action="upload", target_id=document.id)
-        db.add(audit)
-        db.commit()
 
-    return document
+def publish_documents(prepared: List[PreparedDocument]) -> None:
+    published = [item for item in prepared if item.doc_id is not None]
+    index_documents(
+        [
+            build_indexed_document(
+                doc_id=str(item.doc_id),
+                title=item.filename,
+                content=item.text,
+                tags=format_tags(item.metadata.get("tags")),
+            )
+            for item in published
+        ]
+    )
+    facet_index.add(
+        FacetRecord(
+            doc_id=item.doc_id,
+            doc_type=item.metadata.get("doc_type", "Unknown"),
+            department=item.metadata.get("department"),
+            date_published=item.metadata.get("date_published"),
+            is_sensitive=bool(item.metadata.get("is_sensitive", False)),
+        )
+        for item in published
+    )
+
+
+def ingest_batch(
+    db: Session,
+    prepared: List[PreparedDocument],
+    user_id: Optional[int] = None,
+) -> List[Document]:
+    documents = persist_documents(db, prepared, user_id=user_id)
+    publish_documents(prepared)
+    return documents
+
+
+def ingest_file(
+    db: Session,
+    file_path: str,
+    filename: str,
+    metadata: Dict[str, Any],
+    user_id: Optional[int] = None,
+    file_hash: Optional[str] = None,
+) -> Document:
+    file_hash = file_hash or compute_sha256(file_path)
+    if is_duplicate(db, file_hash):
+        raise ValueError("Duplicate document detected")
+
+    prepared = prepare_document(file_path, filename, metadata, file_hash=file_hash)
+    documents = ingest_batch(db, [prepared], user_id=user_id)
+    if not documents:
+        raise ValueError("Duplicate document detected")
+    return documents[0]
+
+
+def is_duplicate(db: Session, file_hash: str) -> bool:
+    return db.query(Document.id).filter(Document.file_hash == file_hash).first() is not None
+
+
+def backfill_summaries(limit: int = 50) -> int:
+    db = SessionLocal()
+    try:
+        pending = (
+            db.query(Document)
+            .filter(Document.ai_summary.is_(None))
+            .order_by(Document.id)
+            .limit(limit)
+            .all()
+        )
+        completed = 0
+        for document in pending:
+            try:
+                text = get_text(document.file_hash, document.file_path)
+            except FileNotFoundError:
+                continue
+            if not text:
+                continue
+            try:
+                document.ai_summary = summarize_document(text)
+            except LLMUnavailableError:
+                break
+            db.add(document)
+            db.commit()
+            completed += 1
+        return completed
+    finally:
+        db.close()
+
+
+def refresh_extracted_text() -> int:
+    db = SessionLocal()
+    try:
+        documents = db.query(Document.file_hash, Document.file_path).all()
+    finally:
+        db.close()
+    return refresh_stale((row.file_hash, row.file_path) for row in documents)
 
 
 def parse_date(value: Optional[str]) -> Optional[date]:
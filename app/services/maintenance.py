@@ -1,14 +1,70 @@
 from __future__ import annotations
 
+import hashlib
+import io
 import json
+import os
+import re
 import shutil
+import sqlite3
+import time
+import uuid
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, closing, contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional, Sequence
 
-from app.core.config import BACKUP_SCHEMA_VERSION, DATA_DIR, DB_PATH, INDEX_DIR, STORAGE_DIR, ensure_directories
+from app.core.config import (
+    AUDIT_ARCHIVE_DIR,
+    BACKUP_COMPRESSION_SAMPLE_BYTES,
+    BACKUP_DIR,
+    BACKUP_MIN_COMPRESSION_RATIO,
+    BACKUP_RESTORE_WORKERS,
+    BACKUP_SCHEMA_VERSION,
+    DATA_DIR,
+    DB_DIR,
+    DB_PATH,
+    INDEX_DIR,
+    RESTORE_DRAIN_TIMEOUT_SECONDS,
+    SQLITE_BUSY_TIMEOUT_MS,
+    STORAGE_DIR,
+    TEXT_DIR,
+    ensure_directories,
+)
+from app.core.database import engine, read_engine
+from app.core.facets import facet_index
+from app.core.migrations import run_migrations
+from app.core.search import snapshot_index
+from app.core.security import invalidate_principal
+from app.models.base import Base
+from app.services.audit import audit_sink
+from app.services.audit_archive import (
+    is_retention_running,
+    snapshot_audit_archive,
+    start_audit_retention,
+    stop_audit_retention,
+)
+from app.services.background import background_writers
+from app.services.bulk import resume_bulk_jobs
+from app.services.ingest_jobs import resume_ingest_jobs, shutdown_ingest_executor
+from app.services.sync import mark_interrupted_jobs, pause_sync_jobs, resume_sync_jobs
+from app.services.watcher import is_watching, start_watch, stop_watch
+from app.services.storage import CHUNK_SIZE, compute_sha256
+
+SHA256_NAME = re.compile(r"[0-9a-f]{64}")
+SAFE_BACKUP_ID = re.compile(r"[0-9A-Za-z_]+")
+RESTORE_ROOTS = {
+    "db": DB_DIR,
+    "index": INDEX_DIR,
+    "storage": STORAGE_DIR,
+    "text": TEXT_DIR,
+    "audit_archive": AUDIT_ARCHIVE_DIR,
+}
 
 
 @dataclass
@@ -18,6 +74,18 @@ class SystemStats:
     last_backup: Optional[str]
 
 
+@dataclass
+class RestoreEntry:
+    archive: zipfile.ZipFile
+    member: str
+    digest: Optional[str]
+    targets: list[Path]
+
+
+def _staging_dir(live: Path) -> Path:
+    return live.with_name(f"{live.name}.restore")
+
+
 def _metadata_payload() -> dict:
     return {
         "schema_version": BACKUP_SCHEMA_VERSION,
@@ -25,10 +93,10 @@ def _metadata_payload() -> dict:
     }
 
 
-def _write_last_backup(backup_path: Path) -> None:
+def _write_last_backup(backup_id: str) -> None:
     payload = {
         "last_backup": datetime.now(timezone.utc).isoformat(),
-        "path": backup_path.as_posix(),
+        "backup_id": backup_id,
     }
     last_backup_file = DATA_DIR / "last_backup.json"
     last_backup_file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
@@ -54,67 +122,376 @@ def get_storage_size_mb() -> float:
     return round(total_bytes / (1024 * 1024), 2)
 
 
-def create_backup(destination: Optional[Path] = None) -> Path:
-    ensure_directories()
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    backup_path = destination or (DATA_DIR / f"ukb_backup_{timestamp}.zip")
+class _ChunkSink(io.RawIOBase):
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _snapshot_database(target: Path) -> None:
+    with closing(sqlite3.connect(DB_PATH.as_posix(), timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)) as source:
+        with closing(sqlite3.connect(target.as_posix())) as destination:
+            source.backup(destination)
+
+
+def _storage_sources() -> Iterator[tuple[str, Path]]:
+    if not STORAGE_DIR.exists():
+        return
+    staging_dir = STORAGE_DIR / "tmp"
+    for path in STORAGE_DIR.rglob("*"):
+        if not path.is_file() or path.suffix == ".tmp" or staging_dir in path.parents:
+            continue
+        yield f"storage/{path.relative_to(STORAGE_DIR).as_posix()}", path
+
+
+def _link_tree(prefix: str, root: Path, pattern: str, target_dir: Path) -> list[tuple[str, Path]]:
+    entries = []
+    if not root.exists():
+        return entries
+    for path in root.rglob(pattern):
+        if not path.is_file():
+            continue
+        relative = path.relative_to(root)
+        snapshot = target_dir / relative
+        snapshot.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, snapshot)
+        except FileNotFoundError:
+            continue
+        except OSError:
+            shutil.copy2(path, snapshot)
+        entries.append((f"{prefix}/{relative.as_posix()}", snapshot))
+    return entries
+
 
-    with zipfile.ZipFile(backup_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        archive.writestr("metadata.json", json.dumps(_metadata_payload(), indent=2))
+@contextmanager
+def _backup_sources(backup_id: str) -> Iterator[Iterator[tuple[str, Path]]]:
+    snapshot_dir = BACKUP_DIR / f"snapshot_{backup_id}"
+    snapshot_dir.mkdir(parents=True)
+    try:
+        snapshots = []
         if DB_PATH.exists():
-            archive.write(DB_PATH, arcname=f"db/{DB_PATH.name}")
-        if INDEX_DIR.exists():
-            for path in INDEX_DIR.rglob("*"):
-                if path.is_file():
-                    archive.write(path, arcname=f"index/{path.relative_to(INDEX_DIR)}")
-        if STORAGE_DIR.exists():
-            for path in STORAGE_DIR.rglob("*"):
-                if path.is_file():
-                    archive.write(path, arcname=f"storage/{path.relative_to(STORAGE_DIR)}")
+            db_snapshot = snapshot_dir / DB_PATH.name
+            _snapshot_database(db_snapshot)
+            snapshots.append((f"db/{DB_PATH.name}", db_snapshot))
+        for relative, path in snapshot_index(snapshot_dir / "index"):
+            snapshots.append((f"index/{relative}", path))
+        snapshots.extend(_link_tree("text", TEXT_DIR, "*.json.gz", snapshot_dir / "text"))
+        for relative, path in snapshot_audit_archive(snapshot_dir / "audit_archive"):
+            snapshots.append((f"audit_archive/{relative}", path))
+        yield chain(snapshots, _storage_sources())
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
 
-    _write_last_backup(backup_path)
-    return backup_path
 
+def _blob_digest(arcname: str, path: Path, stat: os.stat_result, previous: dict) -> str:
+    if arcname.startswith("storage/") and path.suffix == ".pdf" and SHA256_NAME.fullmatch(path.stem):
+        return path.stem
+    cached = previous.get(arcname)
+    if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+        return cached["sha256"]
+    return compute_sha256(path.as_posix())
 
-def restore_backup(backup_path: Path) -> None:
-    ensure_directories()
-    if not backup_path.exists():
-        raise FileNotFoundError("Backup file not found")
 
-    temp_dir = DATA_DIR / "restore_tmp"
-    if temp_dir.exists():
-        shutil.rmtree(temp_dir)
-    temp_dir.mkdir(parents=True, exist_ok=True)
+def _compress_type(source: BinaryIO) -> int:
+    sample = source.read(BACKUP_COMPRESSION_SAMPLE_BYTES)
+    source.seek(0)
+    if not sample:
+        return zipfile.ZIP_STORED
+    ratio = len(zlib.compress(sample, 1)) / len(sample)
+    return zipfile.ZIP_DEFLATED if ratio < BACKUP_MIN_COMPRESSION_RATIO else zipfile.ZIP_STORED
+
+
+def _manifest_path(backup_id: str) -> Path:
+    return BACKUP_DIR / f"{backup_id}.json"
+
+
+def _load_manifest(backup_id: str) -> dict:
+    if not SAFE_BACKUP_ID.fullmatch(backup_id):
+        raise ValueError("Invalid backup id")
+    try:
+        return json.loads(_manifest_path(backup_id).read_text(encoding="utf-8"))
+    except FileNotFoundError as exc:
+        raise ValueError(f"Unknown backup: {backup_id}") from exc
+
+
+def _latest_manifest() -> Optional[dict]:
+    manifests = sorted(BACKUP_DIR.glob("*.json")) if BACKUP_DIR.exists() else []
+    if not manifests:
+        return None
+    return json.loads(manifests[-1].read_text(encoding="utf-8"))
+
+
+def _write_blob(
+    archive: zipfile.ZipFile,
+    sink: _ChunkSink,
+    digest: str,
+    source: BinaryIO,
+    stat: os.stat_result,
+) -> Iterator[bytes]:
+    info = zipfile.ZipInfo(f"blobs/{digest}", date_time=time.localtime(stat.st_mtime)[:6])
+    info.compress_type = _compress_type(source)
+    info.file_size = stat.st_size
+    hasher = hashlib.sha256()
+    with archive.open(info, "w") as target:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            target.write(chunk)
+            data = sink.drain()
+            if data:
+                yield data
+    if hasher.hexdigest() != digest:
+        raise ValueError(f"Blob {digest} changed while it was being backed up")
+
+
+def _generate_backup(backup_id: str, created_at: datetime, parent: Optional[dict]) -> Iterator[bytes]:
+    previous = (parent or _latest_manifest() or {}).get("files", {})
+    known = {entry["sha256"] for entry in parent["files"].values()} if parent else set()
+    parent_id = parent["backup_id"] if parent else None
+
+    files: dict[str, dict] = {}
+    written: set[str] = set()
+    sink = _ChunkSink()
+    with _backup_sources(backup_id) as sources, zipfile.ZipFile(sink, "w") as archive:
+        for arcname, path in sources:
+            try:
+                stat = path.stat()
+                digest = _blob_digest(arcname, path, stat, previous)
+                source = None if digest in known or digest in written else path.open("rb")
+            except FileNotFoundError:
+                continue
+            if source is not None:
+                with source:
+                    yield from _write_blob(archive, sink, digest, source, stat)
+                written.add(digest)
+            files[arcname] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
 
-    with zipfile.ZipFile(backup_path, "r") as archive:
-        archive.extractall(temp_dir)
+        manifest = {
+            "backup_id": backup_id,
+            "parent_id": parent_id,
+            "created_at": created_at.isoformat(),
+            "files": files,
+        }
+        metadata = {
+            **_metadata_payload(),
+            "backup_id": backup_id,
+            "parent_id": parent_id,
+            "blob_count": len(written),
+        }
+        archive.writestr("metadata.json", json.dumps(metadata, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr("manifest.json", json.dumps(manifest), compress_type=zipfile.ZIP_DEFLATED)
+    yield sink.drain()
 
-    metadata_file = temp_dir / "metadata.json"
-    if not metadata_file.exists():
+    _manifest_path(backup_id).write_text(json.dumps(manifest), encoding="utf-8")
+    _write_last_backup(backup_id)
+
+
+def stream_backup(since: Optional[str] = None) -> tuple[str, Iterator[bytes]]:
+    ensure_directories()
+    parent = _load_manifest(since) if since else None
+    created_at = datetime.now(timezone.utc)
+    backup_id = f"{created_at.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    return f"ukb_backup_{backup_id}.zip", _generate_backup(backup_id, created_at, parent)
+
+
+def _read_metadata(archive: zipfile.ZipFile) -> dict:
+    if "metadata.json" not in archive.namelist():
         raise ValueError("Backup metadata missing")
+    return json.loads(archive.read("metadata.json"))
+
+
+def _chain_head(archives: list[tuple[zipfile.ZipFile, dict]]) -> tuple[zipfile.ZipFile, dict]:
+    parent_ids = {metadata.get("parent_id") for _archive, metadata in archives}
+    heads = [item for item in archives if item[1].get("backup_id") not in parent_ids]
+    if len(heads) != 1:
+        raise ValueError("Backup archives do not form a single chain")
+    return heads[0]
+
+
+def _restore_target(arcname: str) -> Path:
+    prefix, _, relative = arcname.partition("/")
+    root = RESTORE_ROOTS.get(prefix)
+    if root is None or not relative:
+        raise ValueError(f"Invalid path in backup: {arcname}")
+    staging = _staging_dir(root).resolve()
+    target = (staging / relative).resolve()
+    if staging not in target.parents:
+        raise ValueError(f"Invalid path in backup: {arcname}")
+    return target
 
-    metadata = json.loads(metadata_file.read_text(encoding="utf-8"))
-    if metadata.get("schema_version") != BACKUP_SCHEMA_VERSION:
+
+def _restore_plan(archives: list[tuple[zipfile.ZipFile, dict]]) -> list[RestoreEntry]:
+    versions = {metadata.get("schema_version") for _archive, metadata in archives}
+    if versions == {1} and len(archives) == 1:
+        archive = archives[0][0]
+        return [
+            RestoreEntry(archive, info.filename, None, [_restore_target(info.filename)])
+            for info in archive.infolist()
+            if not info.is_dir() and info.filename != "metadata.json" and not info.filename.startswith("storage/tmp/")
+        ]
+    if versions != {BACKUP_SCHEMA_VERSION}:
         raise ValueError("Unsupported backup schema version")
 
-    extracted_db = next((temp_dir / "db").glob("*.sqlite3"), None)
-    if extracted_db:
-        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(extracted_db, DB_PATH)
+    head, _metadata = _chain_head(archives)
+    manifest = json.loads(head.read("manifest.json"))
+    blobs: dict[str, zipfile.ZipFile] = {}
+    for archive, _ in archives:
+        for name in archive.namelist():
+            if name.startswith("blobs/"):
+                blobs.setdefault(name[len("blobs/") :], archive)
+
+    targets: dict[str, list[Path]] = {}
+    for arcname, entry in manifest["files"].items():
+        targets.setdefault(entry["sha256"], []).append(_restore_target(arcname))
+    missing = targets.keys() - blobs.keys()
+    if missing:
+        raise ValueError(f"Backup chain is incomplete: {len(missing)} blobs missing; include the parent archives")
+    return [RestoreEntry(blobs[digest], f"blobs/{digest}", digest, paths) for digest, paths in targets.items()]
+
+
+def _extract_entry(entry: RestoreEntry) -> None:
+    first, *copies = entry.targets
+    first.parent.mkdir(parents=True, exist_ok=True)
+    hash_obj = hashlib.sha256()
+    with entry.archive.open(entry.member) as source, first.open("wb") as out_file:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            hash_obj.update(chunk)
+            out_file.write(chunk)
+    if entry.digest is not None and hash_obj.hexdigest() != entry.digest:
+        raise ValueError(f"Backup blob {entry.digest} failed verification")
+    for target in copies:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(first, target)
 
-    extracted_index = temp_dir / "index"
-    if extracted_index.exists():
-        if INDEX_DIR.exists():
-            shutil.rmtree(INDEX_DIR)
-        shutil.copytree(extracted_index, INDEX_DIR)
 
-    extracted_storage = temp_dir / "storage"
-    if extracted_storage.exists():
-        if STORAGE_DIR.exists():
-            shutil.rmtree(STORAGE_DIR)
-        shutil.copytree(extracted_storage, STORAGE_DIR)
+def _extract_all(entries: list[RestoreEntry]) -> None:
+    executor = ThreadPoolExecutor(max_workers=BACKUP_RESTORE_WORKERS, thread_name_prefix="restore")
+    try:
+        for future in as_completed([executor.submit(_extract_entry, entry) for entry in entries]):
+            future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _check_database(path: Path) -> None:
+    try:
+        with closing(sqlite3.connect(path.as_posix())) as connection:
+            result = connection.execute("PRAGMA quick_check").fetchone()
+    except sqlite3.DatabaseError as exc:
+        raise ValueError("Backup database is not a valid SQLite file") from exc
+    if not result or result[0] != "ok":
+        raise ValueError("Backup database failed its integrity check")
 
-    shutil.rmtree(temp_dir)
+
+def _clear_staging() -> None:
+    for root in RESTORE_ROOTS.values():
+        shutil.rmtree(_staging_dir(root), ignore_errors=True)
+
+
+def _swap_database(staged_db: Path) -> None:
+    engine.dispose()
+    read_engine.dispose()
+    if DB_PATH.exists():
+        with closing(sqlite3.connect(DB_PATH.as_posix(), timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)) as connection:
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    for suffix in ("-wal", "-shm"):
+        DB_PATH.with_name(f"{DB_PATH.name}{suffix}").unlink(missing_ok=True)
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(staged_db, DB_PATH)
+
+
+def _swap_directory(live: Path) -> None:
+    staged = _staging_dir(live)
+    retired = live.with_name(f"{live.name}.old")
+    shutil.rmtree(retired, ignore_errors=True)
+    if live.exists():
+        os.rename(live, retired)
+    try:
+        os.rename(staged, live)
+    except OSError:
+        if retired.exists():
+            os.rename(retired, live)
+        raise
+    if live == STORAGE_DIR and (retired / "tmp").exists():
+        shutil.rmtree(live / "tmp", ignore_errors=True)
+        os.rename(retired / "tmp", live / "tmp")
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+@contextmanager
+def _quiesced_writers() -> Iterator[None]:
+    with ExitStack() as stack:
+        if is_watching():
+            stack.callback(start_watch)
+            if not stop_watch(RESTORE_DRAIN_TIMEOUT_SECONDS):
+                raise TimeoutError("The folder watcher did not stop before the restore")
+        stack.callback(background_writers.resume)
+        if not background_writers.pause(RESTORE_DRAIN_TIMEOUT_SECONDS):
+            raise TimeoutError("Background maintenance tasks did not stop before the restore")
+        stack.callback(resume_sync_jobs)
+        if not pause_sync_jobs(RESTORE_DRAIN_TIMEOUT_SECONDS):
+            raise TimeoutError("Sync jobs did not stop before the restore")
+        shutdown_ingest_executor(wait=True)
+        stack.callback(resume_bulk_jobs)
+        stack.callback(resume_ingest_jobs)
+        stack.callback(mark_interrupted_jobs)
+        if is_retention_running():
+            stack.callback(start_audit_retention)
+            if not stop_audit_retention(RESTORE_DRAIN_TIMEOUT_SECONDS):
+                raise TimeoutError("Audit retention did not stop before the restore")
+        audit_sink.pause()
+        stack.callback(audit_sink.resume)
+        yield
+
+
+def restore_backup(backup_path: Path, parent_paths: Sequence[Path] = ()) -> None:
+    ensure_directories()
+    paths = [backup_path, *parent_paths]
+    if not all(path.exists() for path in paths):
+        raise FileNotFoundError("Backup file not found")
+
+    _clear_staging()
+    try:
+        with ExitStack() as stack:
+            archives: list[tuple[zipfile.ZipFile, dict]] = []
+            try:
+                for path in paths:
+                    archive = stack.enter_context(zipfile.ZipFile(path, "r"))
+                    archives.append((archive, _read_metadata(archive)))
+                _extract_all(_restore_plan(archives))
+            except (zipfile.BadZipFile, zlib.error) as exc:
+                raise ValueError("Backup file is not a valid ZIP archive") from exc
+        staged_db = next(_staging_dir(DB_DIR).glob("*.sqlite3"), None)
+        if staged_db:
+            _check_database(staged_db)
+    except BaseException:
+        _clear_staging()
+        raise
+
+    try:
+        with _quiesced_writers():
+            if staged_db:
+                _swap_database(staged_db)
+                Base.metadata.create_all(bind=engine)
+                run_migrations(engine)
+            for root in (INDEX_DIR, STORAGE_DIR, TEXT_DIR, AUDIT_ARCHIVE_DIR):
+                if _staging_dir(root).exists():
+                    _swap_directory(root)
+            facet_index.reset()
+            invalidate_principal()
+    finally:
+        _clear_staging()
 
 
 def system_stats(total_documents: int) -> SystemStats:
@@ -1,16 +1,127 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Optional
+
 import fitz
+import pytesseract
+from PIL import Image
 
+from app.core.config import OCR_DPI, OCR_MIN_PAGE_CHARS, OCR_NICENESS, OCR_PAGE_TIMEOUT_SECONDS, OCR_WORKERS
 
-def extract_text(file_path: str) -> str:
-    doc = fitz.open(file_path)
-    text_chunks = []
-    for page in doc:
-        text_chunks.append(page.get_text())
-    text = "\n".join(text_chunks).strip()
-    if len(text) < 100:
-        text_chunks = []
+EXTRACTOR_VERSION = 2
+
+
+@dataclass
+class PageText:
+    number: int
+    text: str
+    ocr: bool = False
+    seconds: float = 0.0
+
+
+@dataclass
+class PdfExtraction:
+    pages: list[PageText] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page.text for page in self.pages).strip()
+
+    @property
+    def ocr_page_count(self) -> int:
+        return sum(1 for page in self.pages if page.ocr)
+
+
+_pool_lock = threading.Lock()
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _lower_priority() -> None:
+    if hasattr(os, "nice"):
+        os.nice(OCR_NICENESS)
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    with _pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_lower_priority,
+            )
+        return _ocr_pool
+
+
+def _needs_ocr(text: str) -> bool:
+    return len(text.strip()) < OCR_MIN_PAGE_CHARS
+
+
+def _ocr_page(file_path: str, page_index: int, dpi: int) -> tuple[str, float]:
+    start = time.perf_counter()
+    with fitz.open(file_path) as doc:
+        pixmap = doc[page_index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    text = pytesseract.image_to_string(image, timeout=OCR_PAGE_TIMEOUT_SECONDS)
+    return text, time.perf_counter() - start
+
+
+def _run_inline(file_path: str, page_index: int) -> tuple[str, float] | None:
+    try:
+        return _ocr_page(file_path, page_index, OCR_DPI)
+    except Exception:
+        return None
+
+
+def extract_pages(file_path: str) -> PdfExtraction:
+    start = time.perf_counter()
+    pages: list[PageText] = []
+    with fitz.open(file_path) as doc:
         for page in doc:
-            text_chunks.append(page.get_text("text", ocr=True))
-        text = "\n".join(text_chunks).strip()
-    doc.close()
-    return text
+            page_start = time.perf_counter()
+            text = page.get_text()
+            pages.append(PageText(number=page.number + 1, text=text, seconds=time.perf_counter() - page_start))
+
+    pending = [page for page in pages if _needs_ocr(page.text)]
+    if len(pending) == 1:
+        results = {pending[0].number: _run_inline(file_path, pending[0].number - 1)}
+    elif pending:
+        pool = _get_ocr_pool()
+        futures = {
+            page.number: pool.submit(_ocr_page, file_path, page.number - 1, OCR_DPI)
+            for page in pending
+        }
+        results = {}
+        for number, future in futures.items():
+            try:
+                results[number] = future.result(timeout=OCR_PAGE_TIMEOUT_SECONDS)
+            except FutureTimeoutError:
+                future.cancel()
+                results[number] = None
+            except Exception:
+                results[number] = None
+    else:
+        results = {}
+
+    for page in pending:
+        result = results.get(page.number)
+        if result is None:
+            continue
+        ocr_text, seconds = result
+        page.seconds += seconds
+        if len(ocr_text.strip()) > len(page.text.strip()):
+            page.text = ocr_text
+            page.ocr = True
+
+    return PdfExtraction(pages=pages, seconds=time.perf_counter() - start)
+
+
+def extract_text(file_path: str) -> str:
+    return extract_pages(file_path).text
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional
+
+import fitz
+
+from app.core.config import RENDER_CACHE_MAX_BYTES, RENDER_DIR, RENDER_THUMBNAIL_WIDTH
+
+_inflight: dict[tuple[str, int, int], Future] = {}
+_inflight_lock = threading.Lock()
+_cache_lock = threading.Lock()
+_cache_bytes: Optional[int] = None
+
+
+def _render_path(file_hash: str, page: int, width: int) -> Path:
+    return RENDER_DIR / file_hash[:2] / f"{file_hash}.p{page}.w{width}.png"
+
+
+def _render_png(file_path: str, page: int, width: int) -> bytes:
+    with fitz.open(file_path) as doc:
+        if page < 1 or page > doc.page_count:
+            raise IndexError(f"Page {page} out of range")
+        pdf_page = doc[page - 1]
+        zoom = width / pdf_page.rect.width
+        pixmap = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return pixmap.tobytes("png")
+
+
+def _scan_cache() -> list[tuple[float, int, Path]]:
+    entries = []
+    for path in RENDER_DIR.glob("*/*.png"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def _account(size: int) -> None:
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(entry[1] for entry in _scan_cache())
+        else:
+            _cache_bytes += size
+        if _cache_bytes <= RENDER_CACHE_MAX_BYTES:
+            return
+        entries = sorted(_scan_cache())
+        _cache_bytes = sum(entry[1] for entry in entries)
+        for _mtime, entry_size, path in entries:
+            if _cache_bytes <= RENDER_CACHE_MAX_BYTES * 0.9:
+                break
+            path.unlink(missing_ok=True)
+            _cache_bytes -= entry_size
+
+
+def _render_to_cache(file_hash: str, file_path: str, page: int, width: int) -> Path:
+    target = _render_path(file_hash, page, width)
+    payload = _render_png(file_path, page, width)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp_file.write_bytes(payload)
+    os.replace(temp_file, target)
+    _account(len(payload))
+    return target
+
+
+def render_page(file_hash: str, file_path: str, page: int, width: int) -> Path:
+    target = _render_path(file_hash, page, width)
+    try:
+        os.utime(target)
+        return target
+    except FileNotFoundError:
+        pass
+
+    key = (file_hash, page, width)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+    if not leader:
+        return future.result()
+
+    try:
+        future.set_result(_render_to_cache(file_hash, file_path, page, width))
+    except BaseException as exc:
+        future.set_exception(exc)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+    return future.result()
+
+
+def prerender_thumbnail(file_hash: str, file_path: str) -> Optional[Path]:
+    try:
+        return render_page(file_hash, file_path, 1, RENDER_THUMBNAIL_WIDTH)
+    except Exception:
+        return None
@@ -1,9 +1,22 @@
 import hashlib
+import os
 import shutil
+import tempfile
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, Iterator
 
 from app.core.config import STORAGE_DIR, ensure_directories
 
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class StagedFile:
+    path: Path
+    file_hash: str
+    size: int
+
 
 def compute_sha256(file_path: str) -> str:
     hash_obj = hashlib.sha256()
@@ -21,7 +34,51 @@ def move_to_storage(source_path: str, file_hash: str) -> str:
     return target_path.as_posix()
 
 
+def copy_to_storage(source_path: str, file_hash: str) -> str:
+    ensure_directories()
+    target_path = STORAGE_DIR / f"{file_hash}.pdf"
+    fd, temp_name = tempfile.mkstemp(dir=STORAGE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out_file, open(source_path, "rb") as source:
+            shutil.copyfileobj(source, out_file, CHUNK_SIZE)
+        os.replace(temp_name, target_path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return target_path.as_posix()
+
+
 def ensure_temp_dir() -> Path:
     temp_dir = STORAGE_DIR / "tmp"
     temp_dir.mkdir(parents=True, exist_ok=True)
     return temp_dir
+
+
+def stream_to_temp(source: BinaryIO, suffix: str = ".pdf") -> StagedFile:
+    temp_dir = ensure_temp_dir()
+    fd, temp_name = tempfile.mkstemp(dir=temp_dir, suffix=suffix)
+    temp_path = Path(temp_name)
+    hash_obj = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out_file:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                hash_obj.update(chunk)
+                out_file.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return StagedFile(path=temp_path, file_hash=hash_obj.hexdigest(), size=size)
+
+
+def iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    remaining = end - start + 1
+    with path.open("rb") as file_obj:
+        file_obj.seek(start)
+        while remaining > 0:
+            chunk = file_obj.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
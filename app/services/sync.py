@@ -1,16 +1,32 @@
 from __future__ import annotations
 
+import threading
+import time
+import uuid
 from dataclasses import dataclass
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Dict, Iterable, Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.config import INGEST_BATCH_SIZE, RESTORE_DRAIN_TIMEOUT_SECONDS
 from app.core.database import SessionLocal
 from app.models.document import Document
-from app.services.ingestion import ingest_file
+from app.models.sync_job import SyncJob, SyncJobFile
+from app.services.ingestion import PreparedDocument, ingest_batch, is_duplicate, parse_date, prepare_document
 from app.services.storage import compute_sha256
 
+DISCOVERY_BATCH_SIZE = 500
+CHECKPOINT_EVERY = 25
+FAILURE_REPORT_LIMIT = 100
+RESUMABLE_STATUSES = {"cancelled", "failed", "interrupted"}
+ACTIVE_STATUSES = {"pending", "discovering", "running", "cancelling"}
+
+_cancel_events: dict[str, threading.Event] = {}
+_cancel_lock = threading.Condition()
+_paused = threading.Event()
+
 
 @dataclass
 class SyncSummary:
@@ -45,6 +61,279 @@ def dry_run_summary(db: Session, root_dir: str) -> SyncSummary:
     return SyncSummary(new_documents=new_docs, duplicate_documents=duplicates, total_files=total)
 
 
+def serialize_metadata(metadata: Dict[str, object]) -> Dict[str, object]:
+    return {
+        key: value.isoformat() if isinstance(value, date) else value
+        for key, value in metadata.items()
+    }
+
+
+def deserialize_metadata(payload: Optional[Dict[str, object]]) -> Dict[str, object]:
+    metadata = dict(payload or {})
+    if isinstance(metadata.get("date_published"), str):
+        metadata["date_published"] = parse_date(metadata["date_published"])
+    return metadata
+
+
+def create_sync_job(
+    db: Session,
+    root_dir: str,
+    metadata: Dict[str, object],
+    user_id: int | None = None,
+) -> SyncJob:
+    if not Path(root_dir).exists():
+        raise FileNotFoundError(f"Directory not found: {root_dir}")
+    job = SyncJob(
+        id=uuid.uuid4().hex,
+        root_dir=root_dir,
+        job_metadata=serialize_metadata(metadata),
+        user_id=user_id,
+        status="pending",
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_sync_job(db: Session, job_id: str) -> Optional[SyncJob]:
+    return db.query(SyncJob).filter(SyncJob.id == job_id).first()
+
+
+def request_cancel(db: Session, job: SyncJob) -> SyncJob:
+    if job.status not in ACTIVE_STATUSES:
+        raise ValueError(f"Job is already {job.status}")
+    with _cancel_lock:
+        event = _cancel_events.get(job.id)
+    if event is None:
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+    else:
+        event.set()
+        job.status = "cancelling"
+    job.updated_at = datetime.utcnow()
+    db.commit()
+    return job
+
+
+def prepare_resume(db: Session, job: SyncJob) -> SyncJob:
+    if job.status not in RESUMABLE_STATUSES:
+        raise ValueError(f"Job cannot be resumed while {job.status}")
+    job.status = "pending"
+    job.error = None
+    job.finished_at = None
+    job.updated_at = datetime.utcnow()
+    db.commit()
+    return job
+
+
+def pause_sync_jobs(timeout: float = RESTORE_DRAIN_TIMEOUT_SECONDS) -> bool:
+    _paused.set()
+    with _cancel_lock:
+        for event in _cancel_events.values():
+            event.set()
+        return _cancel_lock.wait_for(lambda: not _cancel_events, timeout=timeout)
+
+
+def resume_sync_jobs() -> None:
+    _paused.clear()
+
+
+def mark_interrupted_jobs() -> int:
+    db = SessionLocal()
+    try:
+        jobs = db.query(SyncJob).filter(SyncJob.status.in_(ACTIVE_STATUSES)).all()
+        for job in jobs:
+            job.status = "interrupted"
+            job.updated_at = datetime.utcnow()
+        db.commit()
+        return len(jobs)
+    finally:
+        db.close()
+
+
+def _discover(db: Session, job: SyncJob) -> None:
+    job.status = "discovering"
+    db.commit()
+    known = {row.path for row in db.query(SyncJobFile.path).filter(SyncJobFile.job_id == job.id)}
+    batch: list[SyncJobFile] = []
+    for pdf_path in iter_pdf_files(job.root_dir):
+        path = pdf_path.as_posix()
+        if path in known:
+            continue
+        batch.append(SyncJobFile(job_id=job.id, path=path, size=pdf_path.stat().st_size))
+        if len(batch) >= DISCOVERY_BATCH_SIZE:
+            db.add_all(batch)
+            db.commit()
+            batch = []
+    if batch:
+        db.add_all(batch)
+        db.commit()
+    rows = db.query(SyncJobFile.size).filter(SyncJobFile.job_id == job.id).all()
+    job.total_files = len(rows)
+    job.total_bytes = sum(row.size for row in rows)
+    job.discovered = 1
+    db.commit()
+
+
+def _mark(job: SyncJob, job_file: SyncJobFile, state: str, error: Optional[str] = None) -> None:
+    job_file.state = state
+    job_file.error = error
+    if state == "ingested":
+        job.ingested += 1
+    elif state == "duplicate":
+        job.duplicates += 1
+    else:
+        job.failed += 1
+
+
+def _prepare_file(
+    ingest_db: Session,
+    job: SyncJob,
+    job_file: SyncJobFile,
+    metadata: Dict[str, object],
+) -> Optional[PreparedDocument]:
+    path = Path(job_file.path)
+    if not path.exists():
+        _mark(job, job_file, "failed", "File no longer exists")
+        return None
+    try:
+        if job_file.file_hash is None:
+            job_file.file_hash = compute_sha256(job_file.path)
+        if is_duplicate(ingest_db, job_file.file_hash):
+            _mark(job, job_file, "duplicate")
+            return None
+        return prepare_document(job_file.path, path.name, metadata, file_hash=job_file.file_hash, keep_source=True)
+    except Exception as exc:
+        _mark(job, job_file, "failed", str(exc) or exc.__class__.__name__)
+        return None
+
+
+def _commit_batch(
+    ingest_db: Session,
+    job: SyncJob,
+    batch: list[tuple[SyncJobFile, PreparedDocument]],
+) -> list[Path]:
+    if not batch:
+        return []
+    try:
+        ingest_batch(ingest_db, [prepared for _, prepared in batch], user_id=job.user_id)
+    except Exception as exc:
+        ingest_db.rollback()
+        for job_file, _ in batch:
+            _mark(job, job_file, "failed", str(exc) or exc.__class__.__name__)
+        return []
+    for job_file, prepared in batch:
+        _mark(job, job_file, "ingested" if prepared.doc_id is not None else "duplicate")
+    return [Path(job_file.path) for job_file, _ in batch]
+
+
+def run_sync_job(job_id: str) -> None:
+    with _cancel_lock:
+        if _paused.is_set():
+            return
+        cancel = _cancel_events.setdefault(job_id, threading.Event())
+        cancel.clear()
+    db = SessionLocal()
+    ingest_db = SessionLocal()
+    try:
+        job = get_sync_job(db, job_id)
+        if job is None or job.status != "pending":
+            return
+        metadata = deserialize_metadata(job.job_metadata)
+        run_start = time.monotonic()
+        elapsed_before = job.elapsed_seconds or 0.0
+
+        def checkpoint(batch: list[tuple[SyncJobFile, PreparedDocument]]) -> None:
+            consumed = _commit_batch(ingest_db, job, batch)
+            job.elapsed_seconds = elapsed_before + time.monotonic() - run_start
+            job.updated_at = datetime.utcnow()
+            db.commit()
+            for source in consumed:
+                source.unlink(missing_ok=True)
+
+        try:
+            if not job.discovered:
+                _discover(db, job)
+            job.status = "running"
+            db.commit()
+
+            pending = (
+                db.query(SyncJobFile)
+                .filter(SyncJobFile.job_id == job.id, SyncJobFile.state == "pending")
+                .order_by(SyncJobFile.id)
+                .all()
+            )
+            batch: list[tuple[SyncJobFile, PreparedDocument]] = []
+            since_checkpoint = 0
+            for job_file in pending:
+                if cancel.is_set():
+                    break
+                prepared = _prepare_file(ingest_db, job, job_file, metadata)
+                if prepared is not None:
+                    batch.append((job_file, prepared))
+                job.processed_files += 1
+                job.processed_bytes += job_file.size
+                since_checkpoint += 1
+                if len(batch) >= INGEST_BATCH_SIZE or since_checkpoint >= CHECKPOINT_EVERY:
+                    checkpoint(batch)
+                    batch = []
+                    since_checkpoint = 0
+            checkpoint(batch)
+
+            job.status = "cancelled" if cancel.is_set() else "completed"
+        except Exception as exc:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(exc) or exc.__class__.__name__
+        job.elapsed_seconds = elapsed_before + time.monotonic() - run_start
+        job.updated_at = datetime.utcnow()
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        ingest_db.close()
+        db.close()
+        with _cancel_lock:
+            _cancel_events.pop(job_id, None)
+            _cancel_lock.notify_all()
+
+
+def job_report(db: Session, job: SyncJob) -> dict:
+    elapsed = job.elapsed_seconds or 0.0
+    files_per_sec = job.processed_files / elapsed if elapsed else 0.0
+    bytes_per_sec = job.processed_bytes / elapsed if elapsed else 0.0
+    remaining_bytes = max(job.total_bytes - job.processed_bytes, 0)
+    eta_seconds = None
+    if job.status == "running" and bytes_per_sec:
+        eta_seconds = round(remaining_bytes / bytes_per_sec, 1)
+    failures = (
+        db.query(SyncJobFile.path, SyncJobFile.error)
+        .filter(SyncJobFile.job_id == job.id, SyncJobFile.state == "failed")
+        .order_by(SyncJobFile.id)
+        .limit(FAILURE_REPORT_LIMIT)
+        .all()
+    )
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "root_dir": job.root_dir,
+        "total_files": job.total_files,
+        "total_bytes": job.total_bytes,
+        "processed_files": job.processed_files,
+        "processed_bytes": job.processed_bytes,
+        "ingested": job.ingested,
+        "duplicates": job.duplicates,
+        "failed": job.failed,
+        "files_per_sec": round(files_per_sec, 2),
+        "bytes_per_sec": round(bytes_per_sec, 2),
+        "eta_seconds": eta_seconds,
+        "failures": [{"path": row.path, "error": row.error} for row in failures],
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
 def sync_directory(
     root_dir: str,
     metadata: Dict[str, object],
@@ -52,18 +341,17 @@ def sync_directory(
 ) -> SyncSummary:
     db = SessionLocal()
     try:
-        summary = dry_run_summary(db, root_dir)
-        for pdf_path in iter_pdf_files(root_dir):
-            try:
-                ingest_file(
-                    db=db,
-                    file_path=pdf_path.as_posix(),
-                    filename=pdf_path.name,
-                    metadata=metadata,
-                    user_id=user_id,
-                )
-            except ValueError:
-                continue
-        return summary
+        job_id = create_sync_job(db, root_dir, metadata, user_id).id
+    finally:
+        db.close()
+    run_sync_job(job_id)
+    db = SessionLocal()
+    try:
+        job = get_sync_job(db, job_id)
+        return SyncSummary(
+            new_documents=job.ingested,
+            duplicate_documents=job.duplicates,
+            total_files=job.total_files,
+        )
     finally:
         db.close()
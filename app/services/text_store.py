@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.core.config import TEXT_DIR, ensure_directories
+from app.services.pdf import EXTRACTOR_VERSION, PageText, PdfExtraction, extract_pages
+
+
+def _shard_dir(file_hash: str) -> Path:
+    return TEXT_DIR / file_hash[:2]
+
+
+def _text_path(file_hash: str, version: int = EXTRACTOR_VERSION) -> Path:
+    return _shard_dir(file_hash) / f"{file_hash}.v{version}.json.gz"
+
+
+def is_current(file_hash: str) -> bool:
+    return _text_path(file_hash).exists()
+
+
+def save_extraction(file_hash: str, extraction: PdfExtraction) -> None:
+    ensure_directories()
+    target = _text_path(file_hash)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "file_hash": file_hash,
+        "extractor_version": EXTRACTOR_VERSION,
+        "extracted_at": datetime.now(timezone.utc).isoformat(),
+        "seconds": extraction.seconds,
+        "pages": [
+            {"number": page.number, "text": page.text, "ocr": page.ocr, "seconds": page.seconds}
+            for page in extraction.pages
+        ],
+    }
+    temp_path = target.with_name(f"{target.name}.tmp")
+    with gzip.open(temp_path, "wt", encoding="utf-8") as out_file:
+        json.dump(payload, out_file)
+    os.replace(temp_path, target)
+
+    for stale in target.parent.glob(f"{file_hash}.v*.json.gz"):
+        if stale != target:
+            stale.unlink(missing_ok=True)
+
+
+def load_extraction(file_hash: str) -> Optional[PdfExtraction]:
+    path = _text_path(file_hash)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as in_file:
+            payload = json.load(in_file)
+    except (FileNotFoundError, OSError, json.JSONDecodeError):
+        return None
+    pages = [
+        PageText(
+            number=item["number"],
+            text=item["text"],
+            ocr=item.get("ocr", False),
+            seconds=item.get("seconds", 0.0),
+        )
+        for item in payload.get("pages", [])
+    ]
+    return PdfExtraction(pages=pages, seconds=payload.get("seconds", 0.0))
+
+
+def get_extraction(file_hash: str, file_path: str) -> PdfExtraction:
+    extraction = load_extraction(file_hash)
+    if extraction is None:
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Stored file missing: {file_path}")
+        extraction = extract_pages(file_path)
+        save_extraction(file_hash, extraction)
+    return extraction
+
+
+def get_text(file_hash: str, file_path: str) -> str:
+    return get_extraction(file_hash, file_path).text
+
+
+def refresh_stale(documents: Iterable[tuple[str, str]]) -> int:
+    refreshed = 0
+    for file_hash, file_path in documents:
+        if is_current(file_hash) or not Path(file_path).exists():
+            continue
+        save_extraction(file_hash, extract_pages(file_path))
+        refreshed += 1
+    return refreshed
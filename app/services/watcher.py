@@ -1,23 +1,215 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
 import threading
 import time
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Optional
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
-from app.core.config import WATCH_DIR
+from app.core.config import (
+    WATCH_DIR,
+    WATCH_MANIFEST_PATH,
+    WATCH_POLL_SECONDS,
+    WATCH_QUEUE_SIZE,
+    WATCH_RECONCILE_SECONDS,
+    WATCH_STABLE_SECONDS,
+    WATCH_WORKERS,
+)
 from app.core.database import SessionLocal
+from app.models.document import Document
 from app.services.ingestion import ingest_file
+from app.services.storage import compute_sha256
 
+HASH_LOOKUP_BATCH = 500
 
-class WatcherHandler(FileSystemEventHandler):
-    def on_created(self, event) -> None:
-        if event.is_directory:
-            return
-        path = Path(event.src_path)
-        if path.suffix.lower() != ".pdf":
+
+@dataclass
+class WatcherMetrics:
+    events: int = 0
+    coalesced: int = 0
+    enqueued: int = 0
+    ingested: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    deferred: int = 0
+    reconcile_runs: int = 0
+    reconcile_enqueued: int = 0
+    reconcile_hashed: int = 0
+    last_reconcile_seconds: float = 0.0
+    last_lag_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+
+
+@dataclass
+class _PendingFile:
+    first_seen: float
+    last_event: float
+    size: int = -1
+    mtime_ns: int = -1
+
+
+class WatchIngestor:
+    def __init__(
+        self,
+        workers: int = WATCH_WORKERS,
+        queue_size: int = WATCH_QUEUE_SIZE,
+        stable_seconds: float = WATCH_STABLE_SECONDS,
+        poll_seconds: float = WATCH_POLL_SECONDS,
+        reconcile_seconds: float = WATCH_RECONCILE_SECONDS,
+    ) -> None:
+        self.workers = workers
+        self.stable_seconds = stable_seconds
+        self.poll_seconds = poll_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self._queue: queue.Queue[tuple[Path, float] | None] = queue.Queue(maxsize=queue_size)
+        self._pending: dict[Path, _PendingFile] = {}
+        self._queued: set[Path] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._metrics = WatcherMetrics()
+
+    def notify(self, path: Path) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._metrics.events += 1
+            if path in self._queued:
+                self._metrics.coalesced += 1
+                return
+            pending = self._pending.get(path)
+            if pending is None:
+                self._pending[path] = _PendingFile(first_seen=now, last_event=now)
+            else:
+                pending.last_event = now
+                self._metrics.coalesced += 1
+
+    def start(self) -> None:
+        scheduler = threading.Thread(target=self._schedule_loop, name="watch-scheduler", daemon=True)
+        self._threads.append(scheduler)
+        self._threads.append(threading.Thread(target=self._reconcile_loop, name="watch-reconciler", daemon=True))
+        for index in range(self.workers):
+            self._threads.append(threading.Thread(target=self._worker_loop, name=f"watch-worker-{index}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        self._stop.set()
+        for _ in range(self.workers):
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def _schedule_loop(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            self._promote_stable_files()
+
+    def _reconcile_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.reconcile()
+            except Exception:
+                pass
+            if self._stop.wait(self.reconcile_seconds):
+                return
+
+    def reconcile(self) -> int:
+        start = time.monotonic()
+        manifest = _load_manifest()
+        current: dict[str, dict] = {}
+        hashed = 0
+        for path in _iter_watch_pdfs():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            key = path.relative_to(WATCH_DIR).as_posix()
+            entry = manifest.get(key)
+            if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+                file_hash = entry["hash"]
+            else:
+                try:
+                    file_hash = compute_sha256(path.as_posix())
+                except FileNotFoundError:
+                    continue
+                hashed += 1
+            current[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": file_hash}
+
+        ingested = _ingested_hashes({entry["hash"] for entry in current.values()})
+        missing = [WATCH_DIR / key for key, entry in current.items() if entry["hash"] not in ingested]
+        for path in missing:
+            self.notify(path)
+        _save_manifest(current)
+
+        with self._lock:
+            self._metrics.reconcile_runs += 1
+            self._metrics.reconcile_enqueued += len(missing)
+            self._metrics.reconcile_hashed += hashed
+            self._metrics.last_reconcile_seconds = time.monotonic() - start
+        return len(missing)
+
+    def _promote_stable_files(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            candidates = list(self._pending.items())
+
+        for path, pending in candidates:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+
+            observed = (stat.st_size, stat.st_mtime_ns)
+            stable = (
+                observed == (pending.size, pending.mtime_ns)
+                and now - pending.last_event >= self.stable_seconds
+            )
+            pending.size, pending.mtime_ns = observed
+            if not stable:
+                continue
+
+            try:
+                self._queue.put_nowait((path, pending.first_seen))
+            except queue.Full:
+                with self._lock:
+                    self._metrics.deferred += 1
+                break
+            with self._lock:
+                self._pending.pop(path, None)
+                self._queued.add(path)
+                self._metrics.enqueued += 1
+
+    def _worker_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, first_seen = item
+            lag = time.monotonic() - first_seen
+            with self._lock:
+                self._metrics.last_lag_seconds = lag
+                self._metrics.max_lag_seconds = max(self._metrics.max_lag_seconds, lag)
+            try:
+                self._ingest(path)
+            finally:
+                with self._lock:
+                    self._queued.discard(path)
+                self._queue.task_done()
+
+    def _ingest(self, path: Path) -> None:
+        if not path.exists():
             return
-        time.sleep(1)
         db = SessionLocal()
         try:
             ingest_file(
@@ -27,26 +219,119 @@ class WatcherHandler(FileSystemEventHandler):
                 metadata={"doc_type": "Uncategorized"},
                 user_id=None,
             )
+            outcome = "ingested"
         except ValueError:
-            pass
+            outcome = "duplicates"
+        except Exception:
+            db.rollback()
+            outcome = "failed"
         finally:
             db.close()
+        with self._lock:
+            setattr(self._metrics, outcome, getattr(self._metrics, outcome) + 1)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            payload = asdict(self._metrics)
+            payload["pending"] = len(self._pending)
+        payload["queue_depth"] = self._queue.qsize()
+        payload["queue_capacity"] = self._queue.maxsize
+        return payload
 
 
-def start_watch() -> threading.Thread:
-    handler = WatcherHandler()
+def _iter_watch_pdfs():
+    if not WATCH_DIR.exists():
+        return
+    for path in WATCH_DIR.rglob("*"):
+        if path.suffix.lower() == ".pdf" and path.is_file():
+            yield path
+
+
+def _load_manifest() -> dict[str, dict]:
+    try:
+        return json.loads(WATCH_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(manifest: dict[str, dict]) -> None:
+    WATCH_MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = WATCH_MANIFEST_PATH.with_name(f"{WATCH_MANIFEST_PATH.name}.tmp")
+    temp_path.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(temp_path, WATCH_MANIFEST_PATH)
+
+
+def _ingested_hashes(hashes: set[str]) -> set[str]:
+    found: set[str] = set()
+    pending = list(hashes)
+    db = SessionLocal()
+    try:
+        for start in range(0, len(pending), HASH_LOOKUP_BATCH):
+            batch = pending[start : start + HASH_LOOKUP_BATCH]
+            rows = db.query(Document.file_hash).filter(Document.file_hash.in_(batch)).all()
+            found.update(row.file_hash for row in rows)
+    finally:
+        db.close()
+    return found
+
+
+class WatcherHandler(FileSystemEventHandler):
+    def __init__(self, ingestor: WatchIngestor) -> None:
+        super().__init__()
+        self.ingestor = ingestor
+
+    def _notify(self, raw_path) -> None:
+        path = Path(raw_path)
+        if path.suffix.lower() == ".pdf" and path.is_relative_to(WATCH_DIR):
+            self.ingestor.notify(path)
+
+    def on_created(self, event) -> None:
+        if not event.is_directory:
+            self._notify(event.src_path)
+
+    def on_modified(self, event) -> None:
+        if not event.is_directory:
+            self._notify(event.src_path)
+
+    def on_moved(self, event) -> None:
+        if not event.is_directory:
+            self._notify(event.dest_path)
+
+
+_observer: Optional[Observer] = None
+_ingestor: Optional[WatchIngestor] = None
+
+
+def start_watch() -> WatchIngestor:
+    global _observer, _ingestor
+    ingestor = WatchIngestor()
+    ingestor.start()
     observer = Observer()
-    observer.schedule(handler, WATCH_DIR.as_posix(), recursive=True)
+    observer.schedule(WatcherHandler(ingestor), WATCH_DIR.as_posix(), recursive=True)
+    observer.daemon = True
     observer.start()
+    _observer, _ingestor = observer, ingestor
+    return ingestor
+
+
+def stop_watch(timeout: float = 5.0) -> bool:
+    global _observer, _ingestor
+    stopped = True
+    if _observer is not None:
+        _observer.stop()
+        _observer.join(timeout=timeout)
+        stopped = not _observer.is_alive()
+    if _ingestor is not None:
+        stopped = _ingestor.stop(timeout=timeout) and stopped
+    _observer, _ingestor = None, None
+    return stopped
+
+
+def is_watching() -> bool:
+    return _ingestor is not None
 
-    def _run() -> None:
-        try:
-            while True:
-                time.sleep(1)
-        finally:
-            observer.stop()
-            observer.join()
 
-    thread = threading.Thread(target=_run, daemon=True)
-    thread.start()
-    return thread
+def watcher_metrics() -> dict:
+    if _ingestor is None:
+        return {"running": False}
+    return {"running": True, **_ingestor.metrics()}
@@ -0,0 +1,253 @@
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Query, sessionmaker
+
+from app.api.admin import audit_log_filters, audit_log_query
+from app.api.documents import document_id_query
+from app.core.database import build_engine
+from app.core.facets import facet_rows_query
+from app.core.migrations import explain_query_plan, run_migrations
+from app.models.base import Base
+from app.models.document import Document
+from app.models.sync_job import SyncJobFile
+from app.models.user import User
+from app.services.ingestion import PreparedDocument, persist_documents
+
+DEFAULT_BATCH_SIZES = [1, 10, 25, 100, 500]
+DOC_TYPES = ["CBA", "Grievance", "Policy", "Arbitration", "Other"]
+
+
+def _prepared_documents(count: int) -> list[PreparedDocument]:
+    documents = []
+    for index in range(count):
+        file_hash = uuid.uuid4().hex * 2
+        documents.append(
+            PreparedDocument(
+                filename=f"bench_{index:05d}.pdf",
+                file_hash=file_hash,
+                stored_path=f"storage/{file_hash}.pdf",
+                text="Seniority bidding and grievance timelines. " * 20,
+                metadata={
+                    "doc_type": DOC_TYPES[index % len(DOC_TYPES)],
+                    "department": "Operations",
+                    "tags": ["bench"],
+                },
+                summary=["Benchmark summary"],
+            )
+        )
+    return documents
+
+
+def bench_ingest(total: int, batch_sizes: list[int]) -> None:
+    print(f"{'batch':>8} {'docs':>8} {'seconds':>10} {'docs/sec':>10}")
+    for batch_size in batch_sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            engine = build_engine(Path(temp_dir) / "bench.sqlite3")
+            Base.metadata.create_all(bind=engine)
+            session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+            db = session_factory()
+            try:
+                user = User(username="bench", hashed_password="x", role="Admin")
+                db.add(user)
+                db.commit()
+                user_id = user.id
+
+                documents = _prepared_documents(total)
+                start = time.perf_counter()
+                for offset in range(0, total, batch_size):
+                    persist_documents(db, documents[offset : offset + batch_size], user_id=user_id)
+                elapsed = time.perf_counter() - start
+            finally:
+                db.close()
+                engine.dispose()
+        print(f"{batch_size:>8} {total:>8} {elapsed:>10.3f} {total / elapsed:>10.1f}")
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _run_mixed_load(tuned: bool, seed_documents: int, searchers: int, duration: float) -> dict:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir) / "bench.sqlite3"
+        writer = build_engine(db_path, tuned=tuned)
+        Base.metadata.create_all(bind=writer)
+        reader = build_engine(db_path, read_only=True) if tuned else writer
+        write_sessions = sessionmaker(bind=writer, autocommit=False, autoflush=False)
+        read_sessions = sessionmaker(bind=reader, autocommit=False, autoflush=False)
+
+        db = write_sessions()
+        user = User(username="bench", hashed_password="x", role="Admin")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        persist_documents(db, _prepared_documents(seed_documents), user_id=user_id)
+        db.close()
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        latencies: list[float] = []
+        counters = {"ingested": 0, "search_errors": 0, "ingest_errors": 0}
+
+        def ingest_loop() -> None:
+            session = write_sessions()
+            try:
+                while not stop.is_set():
+                    try:
+                        persist_documents(session, _prepared_documents(25), user_id=user_id)
+                        with lock:
+                            counters["ingested"] += 25
+                    except OperationalError:
+                        session.rollback()
+                        with lock:
+                            counters["ingest_errors"] += 1
+            finally:
+                session.close()
+
+        def search_loop(worker: int) -> None:
+            while not stop.is_set():
+                session = read_sessions()
+                start = time.perf_counter()
+                try:
+                    session.query(Document).filter(
+                        Document.doc_type == DOC_TYPES[worker % len(DOC_TYPES)],
+                        Document.is_sensitive.is_(False),
+                    ).all()
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        latencies.append(elapsed)
+                except OperationalError:
+                    with lock:
+                        counters["search_errors"] += 1
+                finally:
+                    session.close()
+
+        threads = [threading.Thread(target=ingest_loop)]
+        threads.extend(threading.Thread(target=search_loop, args=(index,)) for index in range(searchers))
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        reader.dispose()
+        writer.dispose()
+
+    return {
+        "searches_per_sec": len(latencies) / duration,
+        "search_p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "search_p95_ms": _percentile(latencies, 0.95),
+        "ingest_docs_per_sec": counters["ingested"] / duration,
+        "search_errors": counters["search_errors"],
+        "ingest_errors": counters["ingest_errors"],
+    }
+
+
+def bench_concurrency(seed_documents: int, searchers: int, duration: float) -> None:
+    print(
+        f"{'profile':>8} {'searches/s':>11} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'ingest docs/s':>14} {'errors (s/i)':>13}"
+    )
+    for label, tuned in (("default", False), ("tuned", True)):
+        result = _run_mixed_load(tuned, seed_documents, searchers, duration)
+        errors = f"{result['search_errors']}/{result['ingest_errors']}"
+        print(
+            f"{label:>8} {result['searches_per_sec']:>11.1f} {result['search_p50_ms']:>8.2f} "
+            f"{result['search_p95_ms']:>8.2f} {result['ingest_docs_per_sec']:>14.1f} {errors:>13}"
+        )
+
+
+def query_shapes(db) -> list[tuple[str, Query]]:
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    cursor = (datetime(2024, 6, 1, 12, 0), 500)
+    return [
+        ("search: doc_type", document_id_query(db, doc_type="CBA")),
+        ("search: doc_type + department", document_id_query(db, doc_type="CBA", department="Operations")),
+        ("search: department + dates", document_id_query(db, department="Safety", start_date=start, end_date=end)),
+        ("search: dates", document_id_query(db, start_date=start, end_date=end)),
+        ("search: non-admin, no filters", document_id_query(db)),
+        ("facets: load", facet_rows_query(db)),
+        ("audit: newest first", audit_log_query(db, []).limit(26)),
+        ("audit: next page", audit_log_query(db, [], cursor).limit(26)),
+        ("audit: by user", audit_log_query(db, audit_log_filters(user_id=1), cursor).limit(26)),
+        ("audit: by action", audit_log_query(db, audit_log_filters(action="search")).limit(26)),
+        (
+            "audit: date range",
+            audit_log_query(db, audit_log_filters(start=datetime(2024, 1, 1), end=datetime(2024, 2, 1))).limit(26),
+        ),
+        (
+            "sync: pending files",
+            db.query(SyncJobFile)
+            .filter(SyncJobFile.job_id == "job", SyncJobFile.state == "pending")
+            .order_by(SyncJobFile.id),
+        ),
+    ]
+
+
+def query_plan(engine: Engine, query: Query) -> list[str]:
+    compiled = query.statement.compile(dialect=engine.dialect)
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as connection:
+        return explain_query_plan(connection, str(compiled), parameters)
+
+
+def show_plans() -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = build_engine(Path(temp_dir) / "bench.sqlite3")
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+        db = sessionmaker(bind=engine)()
+        table_scans = 0
+        try:
+            for label, query in query_shapes(db):
+                plan = query_plan(engine, query)
+                scans = [line for line in plan if line.startswith("SCAN") and "INDEX" not in line]
+                table_scans += len(scans)
+                print(f"{'SCAN' if scans else 'ok':>4}  {label}")
+                for line in plan:
+                    print(f"        {line}")
+        finally:
+            db.close()
+            engine.dispose()
+    if table_scans:
+        raise SystemExit(f"{table_scans} full table scans found")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="UKB performance benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Database write throughput against ingest batch size.")
+    ingest.add_argument("--documents", type=int, default=1000)
+    ingest.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+
+    concurrency = subparsers.add_parser("concurrency", help="Search latency while ingest writes run concurrently.")
+    concurrency.add_argument("--documents", type=int, default=2000)
+    concurrency.add_argument("--searchers", type=int, default=4)
+    concurrency.add_argument("--duration", type=float, default=10.0)
+
+    subparsers.add_parser("plans", help="Print query plans for the search, facet, audit and sync query shapes.")
+
+    args = parser.parse_args()
+    if args.command == "ingest":
+        bench_ingest(args.documents, args.batch_sizes)
+    elif args.command == "concurrency":
+        bench_concurrency(args.documents, args.searchers, args.duration)
+    elif args.command == "plans":
+        show_plans()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,12 @@ from pathlib import Path
 from app.api import admin, auth, documents
 from app.core.database import init_db
 from app.core.search import ensure_index
-from app.services.watcher import start_watch
+from app.services.audit import audit_sink
+from app.services.audit_archive import start_audit_retention, stop_audit_retention
+from app.services.bulk import resume_bulk_jobs
+from app.services.ingest_jobs import resume_ingest_jobs, shutdown_ingest_executor
+from app.services.sync import mark_interrupted_jobs
+from app.services.watcher import start_watch, stop_watch
 
 
 def create_app() -> FastAPI:
@@ -27,8 +32,20 @@ def create_app() -> FastAPI:
     def startup() -> None:
         init_db()
         ensure_index()
+        mark_interrupted_jobs()
+        resume_ingest_jobs()
+        resume_bulk_jobs()
+        audit_sink.start()
+        start_audit_retention()
         start_watch()
 
+    @app.on_event("shutdown")
+    def shutdown() -> None:
+        stop_watch()
+        shutdown_ingest_executor()
+        stop_audit_retention()
+        audit_sink.shutdown()
+
     ui_dist = Path(__file__).resolve().parent / "ui" / "dist"
     if ui_dist.exists():
         app.mount("/", StaticFiles(directory=ui_dist, html=True), name="ui")
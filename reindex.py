@@ -0,0 +1,95 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.database import SessionLocal, init_db
+from app.core.search import (
+    IndexedDocument,
+    activate_index_generation,
+    build_index_generation,
+    build_indexed_document,
+    ensure_index,
+)
+from app.models.document import Document
+from app.services.ingestion import format_tags
+from app.services.text_store import get_text
+
+
+def _load_rows() -> list[tuple[str, str, str, str, str]]:
+    db = SessionLocal()
+    try:
+        documents = db.query(Document).order_by(Document.id).all()
+        return [
+            (str(doc.id), doc.filename, format_tags(doc.tags), doc.file_hash, doc.file_path)
+            for doc in documents
+        ]
+    finally:
+        db.close()
+
+
+def _load_doc_ids() -> set[str]:
+    db = SessionLocal()
+    try:
+        return {str(row.id) for row in db.query(Document.id).all()}
+    finally:
+        db.close()
+
+
+def _prepare(row: tuple[str, str, str, str, str]) -> Optional[IndexedDocument]:
+    doc_id, title, tags, file_hash, file_path = row
+    try:
+        content = get_text(file_hash, file_path)
+    except (FileNotFoundError, RuntimeError):
+        return None
+    return build_indexed_document(doc_id=doc_id, title=title, content=content, tags=tags)
+
+
+def reindex(workers: int, chunk_size: int, progress_every: int) -> None:
+    init_db()
+    ensure_index()
+    rows = _load_rows()
+    total = len(rows)
+    print(f"Rebuilding index for {total} documents with {workers} workers.")
+
+    documents: list[IndexedDocument] = []
+    skipped: list[str] = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done, (row, prepared) in enumerate(
+            zip(rows, pool.map(_prepare, rows, chunksize=chunk_size)), start=1
+        ):
+            if prepared is None:
+                skipped.append(row[0])
+            else:
+                documents.append(prepared)
+            if done % progress_every == 0 or done == total:
+                elapsed = time.perf_counter() - start
+                rate = done / elapsed if elapsed else 0.0
+                print(f"  {done}/{total} documents ({rate:.1f} docs/sec)")
+
+    generation_dir = build_index_generation(documents)
+    carried = activate_index_generation(generation_dir, valid_doc_ids=_load_doc_ids())
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed else 0.0
+    print(f"Activated index generation {generation_dir.name} in {elapsed:.1f}s ({rate:.1f} docs/sec).")
+    if carried is None:
+        print("Previous index was unreadable; skipped carrying over documents indexed during the rebuild.")
+    elif carried:
+        print(f"Carried over {carried} documents indexed during the rebuild.")
+    if skipped:
+        print(f"Skipped {len(skipped)} documents with no stored text or file: {', '.join(skipped)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the UKB search index from the database and storage.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--progress-every", type=int, default=100)
+    args = parser.parse_args()
+    reindex(workers=max(1, args.workers), chunk_size=max(1, args.chunk_size), progress_every=max(1, args.progress_every))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import importlib
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core import config, database
+from app.core.facets import facet_index
+from app.core.migrations import run_migrations
+from app.core.security import create_access_token, hash_password, invalidate_principal
+from app.models.base import Base
+from app.models.user import User
+
+main = importlib.import_module("main")
+
+
+def _rebase(value, root: Path):
+    if isinstance(value, Path) and value != config.BASE_DIR and value.is_relative_to(config.BASE_DIR):
+        return root / value.relative_to(config.BASE_DIR)
+    if isinstance(value, dict) and value and all(isinstance(item, Path) for item in value.values()):
+        return {key: _rebase(item, root) for key, item in value.items()}
+    return value
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    modules = [module for name, module in list(sys.modules.items()) if name == "main" or name.startswith("app.")]
+    for module in modules:
+        for name, value in list(vars(module).items()):
+            rebased = _rebase(value, tmp_path)
+            if rebased is not value:
+                monkeypatch.setattr(module, name, rebased)
+
+    engine = database.build_engine(config.DB_PATH)
+    read_engine = database.build_engine(config.DB_PATH, read_only=True)
+    replacements = {
+        id(database.engine): engine,
+        id(database.read_engine): read_engine,
+        id(database.SessionLocal): sessionmaker(bind=engine, autocommit=False, autoflush=False),
+        id(database.ReadSessionLocal): sessionmaker(bind=read_engine, autocommit=False, autoflush=False),
+    }
+    for module in modules:
+        for name, value in list(vars(module).items()):
+            if id(value) in replacements:
+                monkeypatch.setattr(module, name, replacements[id(value)])
+
+    config.ensure_directories()
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    facet_index.reset()
+    invalidate_principal()
+    yield tmp_path
+    facet_index.reset()
+    invalidate_principal()
+    engine.dispose()
+    read_engine.dispose()
+
+
+@pytest.fixture
+def client(data_root):
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def auth_headers(data_root):
+    def headers(username: str = "admin", role: str = "Admin") -> dict:
+        db = database.SessionLocal()
+        try:
+            if db.query(User.id).filter(User.username == username).first() is None:
+                db.add(User(username=username, hashed_password=hash_password("secret"), role=role))
+                db.commit()
+        finally:
+            db.close()
+        return {"Authorization": f"Bearer {create_access_token(username)}"}
+
+    return headers
@@ -0,0 +1,110 @@
+import anyio
+import pytest
+
+from app.api import documents
+from app.core.admission import AdmissionClass, AdmissionRejected, admission_controller
+
+
+def metrics(name: str) -> dict:
+    return admission_controller.metrics()[name]
+
+
+def test_unauthenticated_requests_are_not_admitted(client):
+    before = metrics("search")
+
+    response = client.get("/documents/search", params={"q": "overtime"})
+
+    assert response.status_code in (401, 403)
+    assert metrics("search")["admitted"] == before["admitted"]
+    assert metrics("search")["in_flight"] == 0
+
+
+def test_queued_requests_wait_on_the_event_loop_and_are_served_in_order():
+    admission = AdmissionClass("test", concurrency=1, queue=100, timeout=5.0, retry_after=1)
+    order = []
+
+    async def request(number: int) -> None:
+        await admission.acquire()
+        order.append(number)
+        await anyio.sleep(0)
+        admission.release()
+
+    async def main() -> None:
+        async with anyio.create_task_group() as group:
+            for number in range(100):
+                group.start_soon(request, number)
+                await anyio.sleep(0)
+
+    anyio.run(main)
+
+    assert order == list(range(100))
+    assert (admission.in_flight, admission.queued) == (0, 0)
+    assert admission.metrics()["admitted"] == 100
+
+
+def test_full_queues_and_timeouts_reject_and_leave_no_waiters():
+    admission = AdmissionClass("test", concurrency=1, queue=1, timeout=0.05, retry_after=1)
+
+    async def main() -> list:
+        await admission.acquire()
+        results = []
+
+        async def waiter() -> None:
+            try:
+                await admission.acquire()
+                results.append("admitted")
+            except AdmissionRejected:
+                results.append("rejected")
+
+        async with anyio.create_task_group() as group:
+            group.start_soon(waiter)
+            await anyio.sleep(0)
+            group.start_soon(waiter)
+        admission.release()
+        return results
+
+    assert sorted(anyio.run(main)) == ["rejected", "rejected"]
+    assert (admission.in_flight, admission.queued) == (0, 0)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    admission = AdmissionClass("test", concurrency=1, queue=1, timeout=5.0, retry_after=1)
+
+    async def main() -> None:
+        await admission.acquire()
+        async with anyio.create_task_group() as group:
+            group.start_soon(admission.acquire)
+            await anyio.sleep(0)
+            assert admission.queued == 1
+            group.cancel_scope.cancel()
+        admission.release()
+
+    anyio.run(main)
+
+    assert (admission.in_flight, admission.queued) == (0, 0)
+
+
+def test_failed_export_stream_releases_its_slot(client, auth_headers, monkeypatch):
+    real_iter_export = documents._iter_export
+    calls = []
+
+    def broken(doc_ids, export_format):
+        calls.append(export_format)
+        if len(calls) > 1:
+            yield from real_iter_export(doc_ids, export_format)
+            return
+        yield "Filename,Date,Department,Tags\r\n"
+        raise RuntimeError("disk read failed")
+
+    monkeypatch.setattr(documents, "_iter_export", broken)
+    headers = auth_headers()
+    before = metrics("export")["admitted"]
+
+    with pytest.raises(RuntimeError):
+        client.get("/documents/export", params={"q": "overtime"}, headers=headers)
+
+    assert metrics("export")["in_flight"] == 0
+    response = client.get("/documents/export", params={"q": "overtime", "format": "ndjson"}, headers=headers)
+    assert response.status_code == 200
+    assert metrics("export")["admitted"] == before + 2
+    assert metrics("export")["in_flight"] == 0
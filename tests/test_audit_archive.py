@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.audit_log import AuditLog
+from app.models.user import User
+from app.services import audit_archive
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+@pytest.fixture
+def archived(data_root):
+    db = audit_archive.SessionLocal()
+    try:
+        alice = User(username="alice", hashed_password="x", role="Admin")
+        bob = User(username="bob", hashed_password="x", role="Read-only")
+        db.add_all([alice, bob])
+        db.flush()
+        base = datetime(2024, 1, 1, 8, 0)
+        for index in range(60):
+            db.add(
+                AuditLog(
+                    user_id=alice.id if index % 2 else bob.id,
+                    action="search" if index % 3 else "view",
+                    timestamp=base + timedelta(hours=6 * index),
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+    assert audit_archive.archive_audit_logs(retention_days=30, now=NOW) == 60
+    return sorted(
+        [
+            (
+                base + timedelta(hours=6 * index),
+                index + 1,
+                "alice" if index % 2 else "bob",
+                "search" if index % 3 else "view",
+            )
+            for index in range(60)
+        ],
+        reverse=True,
+    )
+
+
+def keys(records):
+    return [(record["timestamp"], record["id"]) for record in records]
+
+
+def test_pages_are_newest_first_and_resume_from_cursor(archived):
+    seen = []
+    cursor = None
+    while True:
+        page = audit_archive.archived_logs_page(cursor=cursor, limit=7)
+        seen.extend(page)
+        if len(page) < 7:
+            break
+        cursor = (page[-1]["timestamp"], page[-1]["id"])
+
+    assert keys(seen) == [(timestamp, log_id) for timestamp, log_id, _user, _action in archived]
+
+
+def test_duplicate_appends_are_ignored(archived):
+    first_day = archived[-1][0].date()
+    records = list(audit_archive._stream_segment(audit_archive._segment_path(first_day)))
+    for record in records:
+        record["timestamp"] = record["timestamp"].isoformat()
+    audit_archive._append_segment(first_day, records)
+
+    page = audit_archive.archived_logs_page(limit=100)
+
+    assert len(page) == 60
+    assert audit_archive.count_archived_logs() == 60
+
+
+def test_counts_come_from_sidecars_and_match_filters(archived, monkeypatch):
+    expected = sum(1 for _ts, _id, user, action in archived if user == "alice" and action == "search")
+
+    def no_scan(_path):
+        raise AssertionError("segment scanned for a whole-day count")
+
+    monkeypatch.setattr(audit_archive, "_stream_segment", no_scan)
+
+    assert audit_archive.count_archived_logs() == 60
+    assert audit_archive.count_archived_logs(user="alice", action="search") == expected
+
+
+def test_missing_sidecar_is_rebuilt(archived):
+    for counts_path in audit_archive.AUDIT_ARCHIVE_DIR.glob("*/*.counts.json"):
+        counts_path.unlink()
+
+    assert audit_archive.count_archived_logs(action="view") == sum(1 for item in archived if item[3] == "view")
+    assert list(audit_archive.AUDIT_ARCHIVE_DIR.glob("*/*.counts.json"))
+
+
+def test_partial_days_and_aware_datetimes_are_normalized_to_utc(archived):
+    start = datetime(2024, 1, 3, 10, 0, tzinfo=timezone(timedelta(hours=2)))
+    end = datetime(2024, 1, 5, 9, 0, tzinfo=timezone.utc)
+    naive_start = datetime(2024, 1, 3, 8, 0)
+    naive_end = datetime(2024, 1, 5, 9, 0)
+    expected = [item for item in archived if naive_start <= item[0] <= naive_end]
+
+    page = audit_archive.archived_logs_page(start=start, end=end, limit=100)
+    cursor = (datetime(2024, 1, 4, 16, 0, tzinfo=timezone(timedelta(hours=2))), 10**6)
+    after_cursor = audit_archive.archived_logs_page(start=start, end=end, cursor=cursor, limit=100)
+
+    assert keys(page) == [(item[0], item[1]) for item in expected]
+    assert audit_archive.count_archived_logs(start=start, end=end) == len(expected)
+    assert keys(after_cursor) == [(item[0], item[1]) for item in expected if item[0] <= datetime(2024, 1, 4, 14, 0)]
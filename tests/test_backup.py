@@ -0,0 +1,85 @@
+import gzip
+import hashlib
+import io
+import json
+import zipfile
+from datetime import date
+
+import pytest
+
+from app.core.admission import admission_controller
+from app.services import audit_archive, maintenance
+
+
+def backup_slots() -> dict:
+    return admission_controller.metrics()["backup"]
+
+
+def test_failed_backup_stream_releases_the_backup_slot(client, auth_headers, monkeypatch):
+    headers = auth_headers()
+    real_snapshot = maintenance._snapshot_database
+    calls = []
+
+    def failing_snapshot(target):
+        calls.append(target)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        real_snapshot(target)
+
+    monkeypatch.setattr(maintenance, "_snapshot_database", failing_snapshot)
+
+    with pytest.raises(OSError):
+        client.post("/admin/backup", headers=headers)
+
+    assert backup_slots()["in_flight"] == 0
+    response = client.post("/admin/backup", headers=headers)
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert "manifest.json" in archive.namelist()
+    assert backup_slots()["in_flight"] == 0
+
+
+def backup_archive(chunks) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_blobs_match_manifest_digests_when_segments_grow_mid_backup(data_root):
+    day = audit_archive._segment_path(date(2024, 1, 1)).parent
+    records = [
+        {"id": number, "timestamp": f"2024-01-01T0{number}:00:00", "user": "alice", "action": "search"}
+        for number in range(1, 4)
+    ]
+    audit_archive._append_segment(date(2024, 1, 1), records[:2])
+
+    _filename, chunks = maintenance.stream_backup()
+    first = next(chunks)
+    audit_archive._append_segment(date(2024, 1, 1), records[2:])
+    archive = backup_archive([first, *chunks])
+
+    manifest = json.loads(archive.read("manifest.json"))
+    for entry in manifest["files"].values():
+        assert hashlib.sha256(archive.read(f"blobs/{entry['sha256']}")).hexdigest() == entry["sha256"]
+    segment = manifest["files"][f"audit_archive/{day.name}/audit-2024-01-01.jsonl.gz"]
+    lines = gzip.decompress(archive.read(f"blobs/{segment['sha256']}")).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
+
+
+def test_blob_that_does_not_match_its_digest_fails_without_a_manifest(data_root, monkeypatch):
+    monkeypatch.setattr(maintenance, "_blob_digest", lambda *_args: "0" * 64)
+
+    _filename, chunks = maintenance.stream_backup()
+    with pytest.raises(ValueError, match="changed while it was being backed up"):
+        list(chunks)
+
+    assert list(maintenance.BACKUP_DIR.glob("*.json")) == []
+    assert list(maintenance.BACKUP_DIR.glob("snapshot_*")) == []
+
+
+def test_non_admin_backup_is_rejected_before_taking_the_slot(client, auth_headers):
+    before = backup_slots()["admitted"]
+
+    response = client.post("/admin/backup", headers=auth_headers("reader", "Read-only"))
+
+    assert response.status_code == 403
+    assert backup_slots()["admitted"] == before
+    assert backup_slots()["in_flight"] == 0
@@ -0,0 +1,134 @@
+import io
+import zipfile
+
+import fitz
+import pytest
+
+from app.core import config
+from app.models.document import Document
+from app.services import bulk, ingestion
+
+
+def pdf_bytes(text: str) -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    payload = doc.tobytes()
+    doc.close()
+    return payload
+
+
+@pytest.fixture
+def queued(data_root, monkeypatch):
+    def offline(_text):
+        raise ingestion.LLMUnavailableError("offline")
+
+    submitted = []
+    monkeypatch.setattr(ingestion, "summarize_document", offline)
+    monkeypatch.setattr(bulk, "submit_ingest_task", lambda task, job_id: submitted.append((task, job_id)))
+    return submitted
+
+
+def upload(client, headers):
+    pdfs = [pdf_bytes(f"Collective agreement {number} " * 4) for number in range(4)]
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as out:
+        for number, payload in enumerate(pdfs):
+            out.writestr(f"cba-{number}.pdf", payload)
+        out.writestr("notes.txt", "not a pdf")
+    files = [
+        ("files", ("batch.zip", archive.getvalue(), "application/zip")),
+        ("files", ("copy.pdf", pdfs[0], "application/pdf")),
+    ]
+    return client.post("/documents/upload/bulk", params={"doc_type": "CBA"}, files=files, headers=headers)
+
+
+def document_count() -> int:
+    db = bulk.SessionLocal()
+    try:
+        return db.query(Document).count()
+    finally:
+        db.close()
+
+
+def test_bulk_upload_returns_a_job_and_ingests_in_the_background(client, auth_headers, queued):
+    headers = auth_headers()
+    response = upload(client, headers)
+
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["total"] == 6
+    assert queued == [(bulk.run_bulk_job, job_id)]
+    assert document_count() == 0
+
+    status = client.get(f"/documents/upload/bulk/{job_id}", headers=headers).json()
+    assert (status["status"], status["pending"], status["skipped"]) == ("pending", 5, 1)
+
+    bulk.run_bulk_job(job_id)
+
+    status = client.get(f"/documents/upload/bulk/{job_id}", headers=headers).json()
+    assert status["status"] == "completed"
+    assert (status["ingested"], status["duplicates"], status["skipped"], status["pending"]) == (4, 1, 1, 0)
+    assert document_count() == 4
+    assert len(list(config.STORAGE_DIR.glob("*.pdf"))) == 4
+
+
+def test_bulk_job_status_is_private_to_the_uploader(client, auth_headers, queued):
+    response = upload(client, auth_headers())
+
+    status = client.get(
+        f"/documents/upload/bulk/{response.json()['job_id']}",
+        headers=auth_headers("reader", "Read-only"),
+    )
+
+    assert status.status_code == 404
+
+
+def test_resume_settles_files_moved_before_the_crash(client, auth_headers, queued, monkeypatch):
+    job_id = upload(client, auth_headers()).json()["job_id"]
+    real_commit = bulk._commit
+
+    def crash(db, batch, user_id):
+        real_commit(db, batch, user_id)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(bulk, "_commit", crash)
+    with pytest.raises(KeyboardInterrupt):
+        bulk.run_bulk_job(job_id)
+    monkeypatch.setattr(bulk, "_commit", real_commit)
+
+    queued.clear()
+    assert bulk.resume_bulk_jobs() == 1
+    assert queued == [(bulk.run_bulk_job, job_id)]
+    bulk.run_bulk_job(job_id)
+
+    db = bulk.SessionLocal()
+    try:
+        report = bulk.bulk_job_report(db, bulk.get_bulk_job(db, job_id))
+    finally:
+        db.close()
+    assert report["status"] == "completed"
+    assert (report["ingested"], report["duplicates"], report["failed"]) == (4, 1, 0)
+    assert document_count() == 4
+
+
+@pytest.mark.parametrize(
+    "limit, value, pdf_count",
+    [("BULK_MAX_ZIP_ENTRIES", 3, 4), ("BULK_MAX_EXPANDED_BYTES", 64 * 1024, 1)],
+)
+def test_oversized_zip_is_rejected_before_staging(client, auth_headers, queued, monkeypatch, limit, value, pdf_count):
+    monkeypatch.setattr(bulk, limit, value)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as out:
+        out.writestr("padding.pdf", b"\0" * 128 * 1024)
+        for number in range(pdf_count - 1):
+            out.writestr(f"extra-{number}.pdf", pdf_bytes(f"Extra {number}"))
+    files = [
+        ("files", ("first.pdf", pdf_bytes("Staged before the archive"), "application/pdf")),
+        ("files", ("bomb.zip", archive.getvalue(), "application/zip")),
+    ]
+    response = client.post("/documents/upload/bulk", params={"doc_type": "CBA"}, files=files, headers=auth_headers())
+
+    assert response.status_code == 400
+    assert "ZIP archives are limited" in response.json()["detail"]
+    assert list((config.STORAGE_DIR / "tmp").iterdir()) == []
+    assert queued == []
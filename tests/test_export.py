@@ -0,0 +1,44 @@
+import json
+
+from app.core import database, search
+from app.models.document import Document
+
+
+def store_documents(contents: dict) -> dict:
+    db = database.SessionLocal()
+    try:
+        documents = {
+            name: Document(filename=f"{name}.pdf", file_path=f"/missing/{name}.pdf", file_hash=name, doc_type="Report")
+            for name in contents
+        }
+        db.add_all(documents.values())
+        db.commit()
+        ids = {name: document.id for name, document in documents.items()}
+    finally:
+        db.close()
+    search.index_documents(
+        [
+            search.build_indexed_document(doc_id=str(ids[name]), title=name, content=content, tags="")
+            for name, content in contents.items()
+        ]
+    )
+    return ids
+
+
+def test_export_keeps_the_same_matches_as_search(client, auth_headers):
+    ids = store_documents(
+        {
+            "budget": "annual budget report for the budget committee",
+            "minutes": "meeting minutes mention the budget once",
+            "roster": "staff roster and holiday schedule",
+        }
+    )
+    headers = auth_headers()
+
+    searched = [int(item["doc_id"]) for item in client.get("/documents/search?q=budget", headers=headers).json()]
+    response = client.get("/documents/export?q=budget&format=ndjson", headers=headers)
+    exported = [json.loads(line)["id"] for line in response.text.splitlines()]
+
+    assert response.status_code == 200
+    assert ids["roster"] in searched
+    assert exported == searched
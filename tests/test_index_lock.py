@@ -0,0 +1,76 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.core import search
+
+HOLD_LOCK = """
+import fcntl, sys, time
+with open(sys.argv[1], "a") as lock_file:
+    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+    print("locked", flush=True)
+    time.sleep(float(sys.argv[2]))
+"""
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "INDEX_DIR", tmp_path)
+    monkeypatch.setattr(search, "INDEX_FILE", tmp_path / search.INDEX_FILE_NAME)
+    monkeypatch.setattr(search, "CURRENT_FILE", tmp_path / "CURRENT")
+    monkeypatch.setattr(search, "LOCK_FILE", tmp_path / "LOCK")
+    monkeypatch.setattr(search, "GENERATIONS_DIR", tmp_path / "generations")
+    monkeypatch.setattr(search, "ensure_directories", lambda: None)
+    return tmp_path
+
+
+def doc(doc_id: str) -> search.IndexedDocument:
+    return search.build_indexed_document(doc_id=doc_id, title=f"title {doc_id}", content="body", tags="")
+
+
+@pytest.mark.skipif(search.fcntl is None, reason="requires fcntl")
+def test_index_update_waits_for_lock_held_by_another_process(index_dir):
+    search.ensure_index()
+    holder = subprocess.Popen(
+        [sys.executable, "-c", HOLD_LOCK, str(search.LOCK_FILE), "0.5"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        start = time.monotonic()
+        search.index_documents([doc("1")])
+        assert time.monotonic() - start >= 0.3
+    finally:
+        holder.wait()
+
+    assert [item.doc_id for item in search._load_index()] == ["1"]
+
+
+def test_update_during_rebuild_is_carried_into_new_generation(index_dir):
+    search.ensure_index()
+    search.index_documents([doc("1")])
+    generation = search.build_index_generation([doc("1")])
+    search.index_documents([doc("2")])
+
+    carried = search.activate_index_generation(generation, valid_doc_ids={"1", "2"})
+    search.index_documents([doc("3")])
+
+    assert carried == 1
+    assert search.active_index_file().parent == generation
+    assert sorted(item.doc_id for item in search._load_index()) == ["1", "2", "3"]
+
+
+def test_corrupt_live_index_does_not_block_activation(index_dir):
+    search.ensure_index()
+    search.index_documents([doc("1")])
+    generation = search.build_index_generation([doc("1"), doc("2")])
+    search.active_index_file().write_text("{corrupt", encoding="utf-8")
+
+    carried = search.activate_index_generation(generation, valid_doc_ids={"1", "2"})
+
+    assert carried is None
+    assert search.active_index_file().parent == generation
+    assert sorted(item.doc_id for item in search._load_index()) == ["1", "2"]
@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.analysis import CircuitBreaker, LLMClient, LLMUnavailableError
+
+
+class FakeOllama:
+    def __init__(self) -> None:
+        self.delay = 0.0
+        self.status = 200
+        self.requests = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.peak = max(fake.peak, fake.in_flight)
+                time.sleep(fake.delay)
+                with fake._lock:
+                    fake.in_flight -= 1
+                body = json.dumps({"model": "fake", "response": " ok ", "done": True}).encode()
+                try:
+                    self.send_response(fake.status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *_args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def ollama():
+    fake = FakeOllama()
+    yield fake
+    fake.close()
+
+
+def make_client(host: str, timeout: float = 2.0, max_concurrency: int = 2, threshold: int = 2, cooldown: float = 30.0):
+    return LLMClient(
+        host=host,
+        model="fake",
+        timeout=timeout,
+        max_concurrency=max_concurrency,
+        breaker=CircuitBreaker(threshold, cooldown),
+    )
+
+
+def test_generate_returns_stripped_response(ollama):
+    client = make_client(ollama.host)
+
+    assert client.generate("hello") == "ok"
+    assert client.metrics()["successes"] == 1
+
+
+def test_timeout_is_reported_as_unavailable(ollama):
+    ollama.delay = 1.0
+    client = make_client(ollama.host, timeout=0.2)
+
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailableError):
+        client.generate("slow")
+
+    assert time.monotonic() - start < 0.9
+    assert client.metrics()["failures"] == 1
+
+
+def test_breaker_opens_after_threshold_and_fails_fast(ollama):
+    ollama.status = 500
+    client = make_client(ollama.host, threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError):
+            client.generate("fail")
+    with pytest.raises(LLMUnavailableError, match="circuit open"):
+        client.generate("rejected")
+
+    assert ollama.requests == 2
+    assert client.metrics()["circuit_state"] == "open"
+    assert client.metrics()["rejected"] == 1
+
+
+def test_open_breaker_fails_fast_while_slots_are_busy(ollama):
+    ollama.delay = 0.5
+    client = make_client(ollama.host, max_concurrency=1, threshold=1)
+    holder = threading.Thread(target=client.generate, args=("hold",))
+    holder.start()
+    time.sleep(0.1)
+    client.breaker.record_failure()
+
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailableError, match="circuit open"):
+        client.generate("rejected")
+
+    assert time.monotonic() - start < 0.1
+    holder.join()
+
+
+def test_half_open_allows_a_single_trial_then_closes(ollama):
+    ollama.status = 500
+    client = make_client(ollama.host, threshold=1, cooldown=0.2)
+    with pytest.raises(LLMUnavailableError):
+        client.generate("fail")
+    assert client.breaker.state == "open"
+
+    time.sleep(0.25)
+    assert client.breaker.state == "half_open"
+    ollama.status = 200
+    ollama.delay = 0.3
+    trial = threading.Thread(target=client.generate, args=("trial",))
+    trial.start()
+    time.sleep(0.1)
+    with pytest.raises(LLMUnavailableError, match="circuit open"):
+        client.generate("concurrent")
+    trial.join()
+
+    assert client.breaker.state == "closed"
+    assert client.generate("after") == "ok"
+
+
+def test_failed_half_open_trial_reopens(ollama):
+    ollama.status = 500
+    client = make_client(ollama.host, threshold=1, cooldown=0.2)
+    with pytest.raises(LLMUnavailableError):
+        client.generate("fail")
+    time.sleep(0.25)
+
+    with pytest.raises(LLMUnavailableError, match="request failed"):
+        client.generate("trial")
+
+    assert client.breaker.state == "open"
+
+
+def test_concurrency_cap_limits_in_flight_requests(ollama):
+    ollama.delay = 0.2
+    client = make_client(ollama.host, max_concurrency=2)
+    threads = [threading.Thread(target=client.generate, args=(f"p{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert ollama.requests == 6
+    assert ollama.peak == 2
+
+
+def test_concurrency_cap_rejects_after_waiting_timeout(ollama):
+    client = make_client(ollama.host, timeout=0.2, max_concurrency=1)
+    client._semaphore.acquire()
+
+    with pytest.raises(LLMUnavailableError, match="concurrency limit"):
+        client.generate("queued")
+
+    client._semaphore.release()
+    assert ollama.requests == 0
+    assert client.metrics()["rejected"] == 1
+    assert client.breaker.state == "closed"
@@ -0,0 +1,49 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+from app.services import pdf
+
+
+@pytest.fixture
+def blank_pdf(tmp_path):
+    path = tmp_path / "scanned.pdf"
+    document = fitz.open()
+    for _ in range(2):
+        document.new_page()
+    document.save(path)
+    document.close()
+    return str(path)
+
+
+def test_ocr_pool_spawns_its_workers(monkeypatch):
+    monkeypatch.setattr(pdf, "_ocr_pool", None)
+    pool = pdf._get_ocr_pool()
+    try:
+        assert pool._mp_context.get_start_method() == "spawn"
+    finally:
+        pool.shutdown()
+
+
+def test_page_that_outlives_the_ocr_timeout_is_treated_as_a_failure(blank_pdf, monkeypatch):
+    release = threading.Event()
+
+    def fake_ocr(file_path, page_index, dpi):
+        if page_index == 0:
+            release.wait(5)
+        return f"recognised text for page {page_index + 1} " * 5, 0.1
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(pdf, "_get_ocr_pool", lambda: executor)
+    monkeypatch.setattr(pdf, "_ocr_page", fake_ocr)
+    monkeypatch.setattr(pdf, "OCR_PAGE_TIMEOUT_SECONDS", 0.2)
+    try:
+        extraction = pdf.extract_pages(blank_pdf)
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert [page.ocr for page in extraction.pages] == [False, True]
+    assert extraction.pages[1].text.startswith("recognised text for page 2")
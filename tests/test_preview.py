@@ -0,0 +1,71 @@
+import fitz
+import pytest
+
+from app.core import config, database
+from app.models.audit_log import AuditLog
+from app.models.document import Document
+from app.services import audit
+
+
+def view_count(document_id: int) -> int:
+    audit.audit_sink.flush()
+    db = database.SessionLocal()
+    try:
+        return db.query(AuditLog).filter(AuditLog.action == "view", AuditLog.target_id == document_id).count()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def stored_document(data_root):
+    path = config.STORAGE_DIR / "preview.pdf"
+    pdf = fitz.open()
+    for number in range(2):
+        pdf.new_page().insert_text((72, 72), f"Preview page {number + 1}")
+    pdf.save(path)
+    pdf.close()
+    db = database.SessionLocal()
+    try:
+        document = Document(filename="preview.pdf", file_path=str(path), file_hash="preview-hash", doc_type="Report")
+        db.add(document)
+        db.commit()
+        return document.id
+    finally:
+        db.close()
+
+
+def test_preview_revalidates_and_audits_each_open(client, auth_headers, stored_document):
+    headers = auth_headers()
+    first = client.get(f"/documents/{stored_document}/preview", headers=headers)
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    revalidated = client.get(
+        f"/documents/{stored_document}/preview", headers={**headers, "If-None-Match": first.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+    assert view_count(stored_document) == 2
+
+
+def test_range_chunks_of_one_open_audit_a_single_view(client, auth_headers, stored_document):
+    headers = auth_headers()
+    url = f"/documents/{stored_document}/preview"
+    first = client.get(url, headers={**headers, "Range": "bytes=0-99"})
+    assert first.status_code == 206
+    etag = first.headers["etag"]
+
+    assert client.get(url, headers={**headers, "Range": "bytes=100-199"}).status_code == 206
+    assert client.get(url, headers={**headers, "Range": "bytes=0-199", "If-Range": etag}).status_code == 206
+    assert view_count(stored_document) == 1
+
+
+def test_page_render_audits_a_view_and_revalidates(client, auth_headers, stored_document):
+    headers = auth_headers()
+    url = f"/documents/{stored_document}/pages/1.png"
+    rendered = client.get(url, headers=headers)
+    assert rendered.status_code == 200
+    assert rendered.headers["cache-control"] == "private, no-cache"
+
+    revalidated = client.get(url, headers={**headers, "If-None-Match": rendered.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert view_count(stored_document) == 2
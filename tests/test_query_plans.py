@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import build_engine
+from app.core.migrations import run_migrations
+from app.models.base import Base
+from benchmark import query_plan, query_shapes
+
+EXPECTED_INDEXES = {
+    "search: doc_type": "COVERING INDEX ix_documents_type_dept_date",
+    "search: doc_type + department": "COVERING INDEX ix_documents_type_dept_date",
+    "search: department + dates": "COVERING INDEX ix_documents_dept_date",
+    "search: dates": "COVERING INDEX ix_documents_sensitive_date",
+    "search: non-admin, no filters": "COVERING INDEX ix_documents_sensitive_date",
+    "facets: load": "COVERING INDEX ix_documents_type_dept_date",
+    "audit: newest first": "INDEX ix_audit_logs_timestamp_id",
+    "audit: next page": "INDEX ix_audit_logs_timestamp_id",
+    "audit: by user": "INDEX ix_audit_logs_user_timestamp",
+    "audit: by action": "INDEX ix_audit_logs_action_timestamp",
+    "audit: date range": "INDEX ix_audit_logs_timestamp_id",
+    "sync: pending files": "INDEX ix_sync_job_files_job_state",
+}
+
+
+@pytest.fixture(scope="module")
+def plans(tmp_path_factory):
+    engine = build_engine(tmp_path_factory.mktemp("plans") / "plans.sqlite3")
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        yield {label: query_plan(engine, query) for label, query in query_shapes(db)}
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_every_query_shape_is_checked(plans):
+    assert set(plans) == set(EXPECTED_INDEXES)
+
+
+@pytest.mark.parametrize("label", sorted(EXPECTED_INDEXES))
+def test_query_shape_uses_expected_index(plans, label):
+    plan = plans[label]
+    table_scans = [line for line in plan if line.startswith("SCAN") and "INDEX" not in line]
+
+    assert table_scans == []
+    assert not any("TEMP B-TREE" in line for line in plan)
+    assert f"USING {EXPECTED_INDEXES[label]}" in plan[0]
@@ -0,0 +1,251 @@
+import json
+import threading
+import time
+import zipfile
+
+import anyio
+import fitz
+import pytest
+
+from sqlalchemy import create_engine
+
+from app.core import config
+from app.core.admission import AdmissionClass, AdmissionRejected, admission_controller
+from app.core.migrations import LATEST_VERSION
+from app.models.audit_log import AuditLog
+from app.models.base import Base
+from app.models.bulk_job import BulkJob
+from app.models.document import Document
+from app.models.user import User
+from app.services import audit, ingestion, maintenance, sync
+from app.services.background import background_writers
+
+
+def write_backup(path) -> None:
+    _filename, chunks = maintenance.stream_backup()
+    path.write_bytes(b"".join(chunks))
+
+
+def audit_actions() -> list:
+    db = sync.SessionLocal()
+    try:
+        return [row.action for row in db.query(AuditLog.action).order_by(AuditLog.id)]
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def backup_file(data_root, tmp_path):
+    db = sync.SessionLocal()
+    try:
+        db.add(User(username="steward", hashed_password="x", role="Admin"))
+        db.commit()
+    finally:
+        db.close()
+    path = tmp_path / "backup.zip"
+    write_backup(path)
+    return path
+
+
+def test_audit_entries_recorded_during_the_swap_land_in_the_restored_database(backup_file, monkeypatch):
+    real_swap = maintenance._swap_database
+
+    def swap_while_auditing(staged_db):
+        audit.record_audit(1, "during-restore")
+        assert audit_actions() == []
+        real_swap(staged_db)
+
+    monkeypatch.setattr(maintenance, "_swap_database", swap_while_auditing)
+    maintenance.restore_backup(backup_file)
+
+    assert audit_actions() == ["during-restore"]
+    assert audit.audit_sink.pending() == 0
+
+
+def test_legacy_archive_restores_into_the_current_schema(data_root, tmp_path):
+    legacy_db = tmp_path / "legacy.sqlite3"
+    legacy_engine = create_engine(f"sqlite:///{legacy_db.as_posix()}")
+    Base.metadata.create_all(legacy_engine, tables=[User.__table__, Document.__table__, AuditLog.__table__])
+    with legacy_engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO users (username, hashed_password, role) VALUES ('steward', 'x', 'Admin')"
+        )
+    legacy_engine.dispose()
+    archive_path = tmp_path / "legacy.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("metadata.json", json.dumps({"schema_version": 1}))
+        archive.write(legacy_db, arcname=f"db/{config.DB_PATH.name}")
+
+    maintenance.restore_backup(archive_path)
+
+    db = sync.SessionLocal()
+    try:
+        assert [row.username for row in db.query(User.username)] == ["steward"]
+        assert db.query(BulkJob).count() == 0
+        assert db.connection().exec_driver_sql("PRAGMA user_version").scalar() == LATEST_VERSION
+    finally:
+        db.close()
+
+
+def test_running_sync_jobs_stop_before_the_swap_and_sync_resumes(backup_file, tmp_path, monkeypatch):
+    share = tmp_path / "share"
+    share.mkdir()
+    for number in range(20):
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), f"Grievance {number} " * 4)
+        doc.save((share / f"grievance-{number}.pdf").as_posix())
+        doc.close()
+
+    def offline(_text):
+        raise ingestion.LLMUnavailableError("offline")
+
+    started = threading.Event()
+    real_prepare = sync.prepare_document
+
+    def slow_prepare(*args, **kwargs):
+        started.set()
+        time.sleep(0.05)
+        return real_prepare(*args, **kwargs)
+
+    monkeypatch.setattr(ingestion, "summarize_document", offline)
+    monkeypatch.setattr(sync, "prepare_document", slow_prepare)
+    db = sync.SessionLocal()
+    try:
+        job_id = sync.create_sync_job(db, share.as_posix(), {"doc_type": "Grievance"}).id
+    finally:
+        db.close()
+    worker = threading.Thread(target=sync.run_sync_job, args=(job_id,))
+    worker.start()
+    assert started.wait(10)
+
+    seen = {}
+    real_swap = maintenance._swap_database
+
+    def observe_swap(staged_db):
+        seen["running_jobs"] = dict(sync._cancel_events)
+        seen["worker_alive"] = worker.is_alive()
+        real_swap(staged_db)
+
+    monkeypatch.setattr(maintenance, "_swap_database", observe_swap)
+    maintenance.restore_backup(backup_file)
+    worker.join(10)
+
+    assert seen == {"running_jobs": {}, "worker_alive": False}
+    assert not sync._paused.is_set()
+
+
+def test_drain_waits_for_in_flight_requests_and_rejects_new_ones():
+    admission = AdmissionClass("ingest", concurrency=2, queue=4, timeout=1.0, retry_after=1)
+    events = []
+
+    async def main() -> None:
+        await admission.acquire()
+
+        async def finish() -> None:
+            await anyio.sleep(0.05)
+            events.append("released")
+            admission.release()
+
+        async with anyio.create_task_group() as group:
+            group.start_soon(finish)
+            await admission.drain(1.0)
+            events.append("drained")
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire()
+        admission.resume()
+        await admission.acquire()
+        admission.release()
+
+    anyio.run(main)
+
+    assert events == ["released", "drained"]
+    assert (admission.in_flight, admission.paused) == (0, False)
+
+
+def test_drain_timeout_reopens_admission():
+    admission = AdmissionClass("ingest", concurrency=2, queue=4, timeout=1.0, retry_after=1)
+
+    async def main() -> None:
+        await admission.acquire()
+        with pytest.raises(AdmissionRejected):
+            await admission.drain(0.05)
+        assert not admission.paused
+        admission.release()
+
+    anyio.run(main)
+
+    assert admission.in_flight == 0
+
+
+def test_non_admin_restore_is_rejected_before_admission(client, auth_headers, monkeypatch):
+    drained = []
+    real_drain = admission_controller.drain
+
+    async def spy(name, *args, **kwargs):
+        drained.append(name)
+        await real_drain(name, *args, **kwargs)
+
+    monkeypatch.setattr(admission_controller, "drain", spy)
+    before = admission_controller.metrics()["backup"]["admitted"]
+
+    response = client.post(
+        "/admin/restore",
+        files={"backup_file": ("backup.zip", b"not a zip", "application/zip")},
+        headers=auth_headers("reader", "Read-only"),
+    )
+
+    assert response.status_code == 403
+    assert drained == []
+    assert admission_controller.metrics()["backup"]["admitted"] == before
+
+
+def test_restore_waits_for_running_maintenance_tasks(backup_file, monkeypatch):
+    events = []
+    started = threading.Event()
+
+    def task():
+        started.set()
+        time.sleep(0.2)
+        events.append("task finished")
+
+    real_swap = maintenance._swap_database
+
+    def swap(staged_db):
+        events.append("swap")
+        real_swap(staged_db)
+
+    monkeypatch.setattr(maintenance, "_swap_database", swap)
+    worker = threading.Thread(target=background_writers.run, args=(task,))
+    worker.start()
+    assert started.wait(5)
+
+    maintenance.restore_backup(backup_file)
+    worker.join(5)
+
+    assert events == ["task finished", "swap"]
+
+
+def test_restore_aborts_when_maintenance_tasks_do_not_stop(backup_file, monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+    swapped = []
+
+    def task():
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(maintenance, "RESTORE_DRAIN_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(maintenance, "_swap_database", swapped.append)
+    worker = threading.Thread(target=background_writers.run, args=(task,))
+    worker.start()
+    assert started.wait(5)
+    try:
+        with pytest.raises(TimeoutError):
+            maintenance.restore_backup(backup_file)
+    finally:
+        release.set()
+        worker.join(5)
+
+    assert swapped == []
+    assert not any(path.exists() for path in map(maintenance._staging_dir, maintenance.RESTORE_ROOTS.values()))
+    assert background_writers.run(lambda: "ran") == "ran"
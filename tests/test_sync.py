@@ -0,0 +1,95 @@
+import fitz
+import pytest
+
+from app.core import config
+from app.models.document import Document
+from app.models.sync_job import SyncJob
+from app.services import ingestion, sync
+
+
+def write_pdf(path, text: str) -> None:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    doc.save(path.as_posix())
+    doc.close()
+
+
+@pytest.fixture
+def source_dir(data_root, tmp_path, monkeypatch):
+    def offline(_text):
+        raise ingestion.LLMUnavailableError("offline")
+
+    monkeypatch.setattr(ingestion, "summarize_document", offline)
+    source = tmp_path / "share"
+    source.mkdir()
+    for number in range(10):
+        write_pdf(source / f"contract-{number}.pdf", f"Collective agreement number {number} " * 4)
+    return source
+
+
+def new_job(source) -> str:
+    db = sync.SessionLocal()
+    try:
+        return sync.create_sync_job(db, source.as_posix(), {"doc_type": "Contract"}).id
+    finally:
+        db.close()
+
+
+def load_job(job_id: str) -> SyncJob:
+    db = sync.SessionLocal()
+    try:
+        return sync.get_sync_job(db, job_id)
+    finally:
+        db.close()
+
+
+def document_count() -> int:
+    db = sync.SessionLocal()
+    try:
+        return db.query(Document).count()
+    finally:
+        db.close()
+
+
+def test_crash_before_batch_commit_keeps_sources_and_resume_ingests(source_dir, monkeypatch):
+    job_id = new_job(source_dir)
+    real_ingest_batch = sync.ingest_batch
+
+    def crash(*_args, **_kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(sync, "ingest_batch", crash)
+    with pytest.raises(KeyboardInterrupt):
+        sync.run_sync_job(job_id)
+
+    assert len(list(source_dir.glob("*.pdf"))) == 10
+    assert document_count() == 0
+
+    monkeypatch.setattr(sync, "ingest_batch", real_ingest_batch)
+    assert sync.mark_interrupted_jobs() == 1
+    db = sync.SessionLocal()
+    try:
+        sync.prepare_resume(db, sync.get_sync_job(db, job_id))
+    finally:
+        db.close()
+    sync.run_sync_job(job_id)
+
+    job = load_job(job_id)
+    assert (job.status, job.ingested, job.failed) == ("completed", 10, 0)
+    assert document_count() == 10
+    assert list(source_dir.glob("*.pdf")) == []
+    assert len(list(config.STORAGE_DIR.glob("*.pdf"))) == 10
+
+
+def test_failed_batch_commit_leaves_sources_in_place(source_dir, monkeypatch):
+    def fail(*_args, **_kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(sync, "ingest_batch", fail)
+    job_id = new_job(source_dir)
+    sync.run_sync_job(job_id)
+
+    job = load_job(job_id)
+    assert (job.status, job.ingested, job.failed) == ("completed", 0, 10)
+    assert len(list(source_dir.glob("*.pdf"))) == 10
+
@@ -9,6 +9,8 @@ export default function AdminSettings({ onClose }) {
   const [activeTab, setActiveTab] = useState("Audit Trail");
   const [logs, setLogs] = useState([]);
   const [page, setPage] = useState(1);
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(false);
   const [stats, setStats] = useState({ total_documents: 0, storage_mb: 0, last_backup: null });
@@ -22,12 +24,20 @@ export default function AdminSettings({ onClose }) {
       setLoading(true);
       try {
         const response = await api.get("/admin/audit-logs", {
-          params: { page, page_size: pageSize }
+          params: {
+            page_size: pageSize,
+            cursor: cursors[page - 1] || undefined,
+            include_total: page === 1
+          }
         });
         setLogs(response.data.items || []);
-        setTotal(response.data.total || 0);
+        setNextCursor(response.data.next_cursor || null);
+        if (response.data.total !== null && response.data.total !== undefined) {
+          setTotal(response.data.total);
+        }
       } catch (err) {
         setLogs([]);
+        setNextCursor(null);
       } finally {
         setLoading(false);
       }
@@ -70,13 +80,14 @@ export default function AdminSettings({ onClose }) {
   };
 
   const handleRestore = async (event) => {
-    const file = event.target.files?.[0];
+    const [file, ...parents] = Array.from(event.target.files || []);
     if (!file) return;
     setRestoreLoading(true);
     setMaintenanceError("");
     try {
       const formData = new FormData();
       formData.append("backup_file", file);
+      parents.forEach((parent) => formData.append("parent_files", parent));
       await api.post("/admin/restore", formData);
       const response = await api.get("/admin/stats");
       setStats(response.data);
@@ -145,7 +156,7 @@ export default function AdminSettings({ onClose }) {
                     </tr>
                   ) : (
                     logs.map((log) => (
-                      <tr key={`${log.timestamp}-${log.user}-${log.action}`}>
+                      <tr key={log.id}>
                         <td className="px-4 py-3 text-xs text-slate-400">
                           {new Date(log.timestamp).toLocaleString()}
                         </td>
@@ -173,8 +184,11 @@ export default function AdminSettings({ onClose }) {
                   Prev
                 </button>
                 <button
-                  disabled={page >= totalPages}
-                  onClick={() => setPage((prev) => Math.min(totalPages, prev + 1))}
+                  disabled={!nextCursor}
+                  onClick={() => {
+                    setCursors((prev) => [...prev.slice(0, page), nextCursor]);
+                    setPage((prev) => prev + 1);
+                  }}
                   className="rounded-full border border-slate-700 px-3 py-1 disabled:opacity-40"
                 >
                   Next
@@ -223,6 +237,7 @@ export default function AdminSettings({ onClose }) {
                 <input
                   type="file"
                   accept="application/zip"
+                  multiple
                   onChange={handleRestore}
                   className="hidden"
                   disabled={restoreLoading}
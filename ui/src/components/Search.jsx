@@ -15,6 +15,7 @@ import Upload from "./Upload.jsx";
 
 const docTypes = ["CBA", "Grievance", "Policy", "Arbitration", "Other"];
 const departments = ["All", "Operations", "Safety", "HR", "Benefits", "Legal"];
+const emptyFacets = { total: 0, doc_type: [], department: [], year: [] };
 
 export default function Search({ role, onLogout }) {
   const [query, setQuery] = useState("");
@@ -30,6 +31,7 @@ export default function Search({ role, onLogout }) {
   const [suggestions, setSuggestions] = useState([]);
   const [pageNumber, setPageNumber] = useState(1);
   const [expandedSummaries, setExpandedSummaries] = useState({});
+  const [facets, setFacets] = useState(emptyFacets);
 
   const isAdmin = role === "Admin";
 
@@ -37,13 +39,33 @@ export default function Search({ role, onLogout }) {
     () => Object.keys(docTypeFilters).filter((key) => docTypeFilters[key]),
     [docTypeFilters]
   );
-  const docTypeCounts = useMemo(() => {
-    return results.reduce((acc, item) => {
-      const key = item.doc_type || "Other";
-      acc[key] = (acc[key] || 0) + 1;
-      return acc;
-    }, {});
-  }, [results]);
+  const docTypeCounts = useMemo(
+    () => Object.fromEntries(facets.doc_type.map((bucket) => [bucket.value, bucket.count])),
+    [facets]
+  );
+  const departmentCounts = useMemo(
+    () => Object.fromEntries(facets.department.map((bucket) => [bucket.value, bucket.count])),
+    [facets]
+  );
+
+  useEffect(() => {
+    const delay = setTimeout(async () => {
+      try {
+        const response = await api.get("/documents/facets", {
+          params: {
+            q: query || undefined,
+            start_date: dateRange.start || undefined,
+            end_date: dateRange.end || undefined
+          }
+        });
+        setFacets(response.data);
+      } catch (err) {
+        setFacets(emptyFacets);
+      }
+    }, 350);
+
+    return () => clearTimeout(delay);
+  }, [query, dateRange]);
 
   useEffect(() => {
     if (!query) {
@@ -205,7 +227,7 @@ export default function Search({ role, onLogout }) {
                 >
                   {departments.map((dept) => (
                     <option key={dept} value={dept}>
-                      {dept}
+                      {dept === "All" ? `All (${facets.total})` : `${dept} (${departmentCounts[dept] || 0})`}
                     </option>
                   ))}
                 </select>
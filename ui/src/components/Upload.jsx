@@ -40,6 +40,35 @@ export default function Upload({ onClose, onSuccess }) {
     setLoading(true);
     setError("");
     try {
+      if (files.length > 1 || files.some((file) => file.name.toLowerCase().endsWith(".zip"))) {
+        setQueue(queue.map((item) => ({ ...item, status: "Uploading" })));
+        const formData = new FormData();
+        files.forEach((file) => formData.append("files", file));
+        const response = await api.post("/documents/upload/bulk", formData, {
+          params: metadata
+        });
+        const labels = { pending: "Queued", ingested: "Done", duplicate: "Duplicate", failed: "Failed", skipped: "Skipped" };
+        let job = (await api.get(`/documents/upload/bulk/${response.data.job_id}`)).data;
+        while (true) {
+          setQueue(
+            job.items.map((item) => ({
+              name: item.filename,
+              status: labels[item.status] || item.status
+            }))
+          );
+          if (job.status !== "pending" && job.status !== "running") {
+            break;
+          }
+          await new Promise((resolve) => setTimeout(resolve, 1000));
+          job = (await api.get(`/documents/upload/bulk/${response.data.job_id}`)).data;
+        }
+        if (job.failed > 0) {
+          setError(`${job.failed} file(s) failed to ingest.`);
+          return;
+        }
+        onSuccess();
+        return;
+      }
       const nextQueue = [...queue];
       for (let i = 0; i < files.length; i += 1) {
         nextQueue[i] = { ...nextQueue[i], status: "Uploading" };
@@ -49,8 +78,17 @@ export default function Upload({ onClose, onSuccess }) {
         const response = await api.post("/documents/upload", formData, {
           params: metadata
         });
-        if (response.status === 200) {
-          nextQueue[i] = { ...nextQueue[i], status: "Done" };
+        if (response.status === 202) {
+          let job = response.data;
+          while (job.status === "pending" || job.status === "running") {
+            nextQueue[i] = { ...nextQueue[i], status: job.stage === "queued" ? "Queued" : `Processing (${job.stage})` };
+            setQueue([...nextQueue]);
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+            const status = await api.get(`/documents/upload/${response.data.job_id}`);
+            job = status.data;
+          }
+          const labels = { completed: "Done", duplicate: "Duplicate", failed: "Failed" };
+          nextQueue[i] = { ...nextQueue[i], status: labels[job.status] || job.status };
           setQueue([...nextQueue]);
         }
       }
@@ -83,11 +121,11 @@ export default function Upload({ onClose, onSuccess }) {
           >
             <UploadCloud className="h-8 w-8 text-union-200" />
             <p className="mt-2 text-sm text-slate-300">
-              Drag & drop a PDF or click to choose.
+              Drag & drop PDFs or a ZIP archive, or click to choose.
             </p>
             <input
               type="file"
-              accept="application/pdf"
+              accept="application/pdf,application/zip,.zip"
               multiple
               onChange={(event) => {
                 const selected = Array.from(event.target.files || []);